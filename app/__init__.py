@@ -1,11 +1,11 @@
+import click
 from flask import Flask, render_template
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from flask_login import LoginManager
 from config import config
+from app.db_routing import RoutingSession
 
-db = SQLAlchemy()
-migrate = Migrate()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 login_manager = LoginManager()
 login_manager.login_view = 'auth.login'
 login_manager.login_message = 'Bitte melden Sie sich an, um diese Seite zu sehen.'
@@ -15,15 +15,25 @@ login_manager.login_message_category = 'warning'
 def create_app(config_name='default'):
     app = Flask(__name__)
     app.config.from_object(config[config_name])
+    app.config['CONFIG_NAME'] = config_name
 
     db.init_app(app)
-    migrate.init_app(app, db)
     login_manager.init_app(app)
+    # Migrationen braucht nur die CLI (flask db ...), nicht die Worker
+    if click.get_current_context(silent=True) is not None:
+        init_migrations(app)
+
+    from app import instrumentation, metrics, db_routing, fragment_cache, startup
+    instrumentation.init_app(app)
+    metrics.init_app(app)
+    db_routing.init_app(app)
+    fragment_cache.init_app(app)
+    startup.init_app(app)
 
     @login_manager.user_loader
     def load_user(user_id):
-        from app.models import User
-        return User.query.get(int(user_id))
+        from app.user_cache import load_user as load_cached_user
+        return load_cached_user(int(user_id))
 
     from app.routes.main import main_bp
     from app.routes.clients import clients_bp
@@ -35,6 +45,13 @@ def create_app(config_name='default'):
     app.register_blueprint(entries_bp, url_prefix='/entries')
     app.register_blueprint(auth_bp, url_prefix='/auth')
 
+    from app.commands import data_cli, partitions_cli, archive_cli, export_cli, activity_cli
+    app.cli.add_command(data_cli)
+    app.cli.add_command(partitions_cli)
+    app.cli.add_command(archive_cli)
+    app.cli.add_command(export_cli)
+    app.cli.add_command(activity_cli)
+
     @app.errorhandler(404)
     def not_found_error(error):
         return render_template('errors/404.html'), 404
@@ -47,4 +64,10 @@ def create_app(config_name='default'):
     return app
 
 
-from app import models
+def init_migrations(app):
+    """Registriert Flask-Migrate (lädt alembic und mako - daher nur bei Bedarf)."""
+    from flask_migrate import Migrate
+    Migrate(app, db)
+
+
+from app import models, stats, user_cache, activity
@@ -0,0 +1,224 @@
+"""
+Aktivitätsübersicht pro Klient (Tabelle client_activity).
+
+Je Klient: Anzahl der Pflegeeinträge (inkl. Archiv), Zeitpunkt des letzten
+Eintrags und des letzten Eintrags je Kategorie. Die Klientenliste zeigt und
+sortiert danach in einer einzigen Abfrage, ohne care_entries zu aggregieren.
+
+Gepflegt wird inkrementell, in derselben Transaktion wie die Änderung:
+
+- ORM: after_insert/after_delete von CareEntry passen die Zeile an; sie wird
+  dazu gesperrt (SELECT ... FOR UPDATE), damit gleichzeitige Einträge
+  desselben Klienten nichts überschreiben. Neue Klienten bekommen eine leere
+  Zeile.
+- Massenimport (app/ingest.py) meldet die eingefügten Zeilen über
+  record_inserts().
+- Archivieren verschiebt Einträge nur - die Übersicht bleibt gleich.
+- Wege ohne Events (Testdaten per COPY, gelöste Partitionen) und Reparatur:
+  rebuild() bzw. `flask activity rebuild`.
+"""
+from datetime import datetime
+from itertools import groupby
+from sqlalchemy import event, select, insert, update, delete, func
+from app import db
+from app.models import Client, CareEntry, ClientActivity, EntryArchive
+from app.archive import read_archive
+
+activity = ClientActivity.__table__
+entries = CareEntry.__table__
+archives = EntryArchive.__table__
+
+# Zeilen pro INSERT beim Neuaufbau
+REBUILD_BATCH = 1000
+
+
+def _parse(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+def _last_archived(connection, client_id, categories):
+    """
+    Letzter archivierter Eintrag je Kategorie, neueste Monate zuerst.
+
+    Liest nur so viele Archivdateien, bis alle gesuchten Kategorien gefunden sind.
+    """
+    found = {}
+    missing = set(categories)
+    manifests = connection.execute(
+        select(archives).where(archives.c.client_id == client_id).order_by(archives.c.month.desc())
+    ).all()
+    for manifest in manifests:
+        if not missing:
+            break
+        # Dateien sind absteigend sortiert: der erste Treffer ist der letzte Eintrag
+        for entry in read_archive(manifest):
+            if entry.category in missing:
+                found[entry.category] = entry.recorded_at
+                missing.discard(entry.category)
+    return found
+
+
+def _compute(connection, client_ids=None):
+    """
+    Berechnet die Übersicht aus care_entries und dem Archiv.
+
+    Returns:
+        dict: client_id -> (entry_count, last_entry_at, {Kategorie: datetime})
+    """
+    hot = select(entries.c.client_id, entries.c.category, func.count(), func.max(entries.c.recorded_at)) \
+        .group_by(entries.c.client_id, entries.c.category)
+    archived = select(archives.c.client_id, func.sum(archives.c.entry_count),
+                      func.max(archives.c.last_recorded_at)).group_by(archives.c.client_id)
+    clients = select(Client.id)
+    if client_ids is not None:
+        hot = hot.where(entries.c.client_id.in_(client_ids))
+        archived = archived.where(archives.c.client_id.in_(client_ids))
+        clients = clients.where(Client.id.in_(client_ids))
+
+    result = {client_id: [0, {}] for client_id in connection.execute(clients).scalars()}
+    for client_id, category, count, last in connection.execute(hot):
+        if client_id in result:
+            result[client_id][0] += count
+            result[client_id][1][category] = last
+
+    all_categories = {code for code, _ in CareEntry.CATEGORIES}
+    for client_id, count, last in connection.execute(archived):
+        if client_id not in result:
+            continue
+        result[client_id][0] += int(count or 0)
+        by_category = result[client_id][1]
+        # Nachträglich erfasste Einträge können älter sein als archivierte
+        stale = {category for category in all_categories
+                 if category not in by_category or by_category[category] < last}
+        for category, recorded_at in _last_archived(connection, client_id, stale).items():
+            if category not in by_category or recorded_at > by_category[category]:
+                by_category[category] = recorded_at
+
+    return {
+        client_id: (count, max(by_category.values(), default=None), by_category)
+        for client_id, (count, by_category) in result.items()
+    }
+
+
+def _row_values(client_id, count, last, by_category):
+    return {
+        'client_id': client_id,
+        'entry_count': count,
+        'last_entry_at': last,
+        'last_entry_by_category': {category: value.isoformat()
+                                   for category, value in by_category.items()},
+    }
+
+
+def _refresh(connection, client_id):
+    """Berechnet die Zeile eines Klienten vollständig neu."""
+    summary = _compute(connection, [client_id]).get(client_id)
+    connection.execute(delete(activity).where(activity.c.client_id == client_id))
+    if summary is not None:
+        connection.execute(insert(activity), [_row_values(client_id, *summary)])
+
+
+def _locked_row(connection, client_id):
+    return connection.execute(
+        select(activity).where(activity.c.client_id == client_id).with_for_update()
+    ).first()
+
+
+def _apply_inserts(connection, client_id, count, latest):
+    """Zählt count neue Einträge hinzu; latest: {Kategorie: neuester recorded_at}."""
+    row = _locked_row(connection, client_id)
+    if row is None:
+        _refresh(connection, client_id)
+        return
+    by_category = dict(row.last_entry_by_category or {})
+    for category, recorded_at in latest.items():
+        current = _parse(by_category.get(category))
+        if current is None or recorded_at > current:
+            by_category[category] = recorded_at.isoformat()
+    last = max([row.last_entry_at] + list(latest.values()), key=lambda value: value or datetime.min)
+    connection.execute(update(activity).where(activity.c.client_id == client_id).values(
+        entry_count=row.entry_count + count, last_entry_at=last, last_entry_by_category=by_category
+    ))
+
+
+def _apply_delete(connection, client_id, category, recorded_at):
+    row = _locked_row(connection, client_id)
+    if row is None:
+        _refresh(connection, client_id)
+        return
+    by_category = dict(row.last_entry_by_category or {})
+    current = _parse(by_category.get(category))
+    if current is not None and recorded_at >= current:
+        # Der letzte Eintrag der Kategorie ist weg: Nachfolger über den Index suchen
+        following = connection.execute(
+            select(func.max(entries.c.recorded_at))
+            .where(entries.c.client_id == client_id, entries.c.category == category)
+        ).scalar() or _last_archived(connection, client_id, [category]).get(category)
+        if following is None:
+            by_category.pop(category)
+        else:
+            by_category[category] = following.isoformat()
+    last = max((_parse(value) for value in by_category.values()), default=None)
+    connection.execute(update(activity).where(activity.c.client_id == client_id).values(
+        entry_count=max(row.entry_count - 1, 0), last_entry_at=last, last_entry_by_category=by_category
+    ))
+
+
+@event.listens_for(Client, 'after_insert')
+def _client_created(mapper, connection, target):
+    connection.execute(insert(activity), [_row_values(target.id, 0, None, {})])
+
+
+@event.listens_for(CareEntry, 'after_insert')
+def _entry_created(mapper, connection, target):
+    _apply_inserts(connection, target.client_id, 1, {target.category: target.recorded_at})
+
+
+@event.listens_for(CareEntry, 'after_delete')
+def _entry_deleted(mapper, connection, target):
+    _apply_delete(connection, target.client_id, target.category, target.recorded_at)
+
+
+def record_inserts(rows):
+    """
+    Trägt per Core-INSERT angelegte Einträge nach (z.B. app/ingest.py).
+
+    Muss in derselben Transaktion wie das INSERT laufen.
+
+    Args:
+        rows: dicts mit client_id, category und recorded_at
+    """
+    connection = db.session.connection()
+    # Feste Reihenfolge der Sperren: keine Deadlocks zwischen parallelen Importen
+    rows = sorted(rows, key=lambda row: row['client_id'])
+    for client_id, group in groupby(rows, key=lambda row: row['client_id']):
+        count = 0
+        latest = {}
+        for row in group:
+            count += 1
+            if row['category'] not in latest or row['recorded_at'] > latest[row['category']]:
+                latest[row['category']] = row['recorded_at']
+        _apply_inserts(connection, client_id, count, latest)
+
+
+def rebuild(client_ids=None):
+    """
+    Baut die Übersicht aus care_entries und dem Archiv neu auf (in der laufenden Transaktion).
+
+    Args:
+        client_ids: nur diese Klienten (Standard: alle)
+
+    Returns:
+        Anzahl der Klienten
+    """
+    connection = db.session.connection()
+    summaries = _compute(connection, client_ids)
+    query = delete(activity)
+    if client_ids is not None:
+        query = query.where(activity.c.client_id.in_(client_ids))
+    connection.execute(query)
+
+    rows = [_row_values(client_id, *summary) for client_id, summary in summaries.items()]
+    for start in range(0, len(rows), REBUILD_BATCH):
+        connection.execute(insert(activity), rows[start:start + REBUILD_BATCH])
+    return len(rows)
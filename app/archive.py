@@ -0,0 +1,267 @@
+"""
+Kalt-Archiv für alte Pflegeeinträge.
+
+Einträge vor einem Stichtag werden pro Klient und Monat in eine
+gzip-komprimierte JSONL-Datei unter ARCHIVE_DIR geschrieben und aus
+care_entries gelöscht; die Tabelle entry_archives (EntryArchive) hält pro
+Datei Zeitraum, Anzahl und SHA-256. Die Dateien sind - wie die Tabelle -
+nach (recorded_at, id) absteigend sortiert.
+
+Eintragsverlauf (app/pagination.py) und PDF-Bericht (exports.render_report)
+lesen archivierte Monate transparent mit, sobald der angefragte Zeitraum so
+weit zurückreicht. Archivierte Einträge erscheinen dort als ArchivedEntry
+(archived = True) und können nicht gelöscht werden.
+
+Jede neue Fassung eines Monats bekommt einen eigenen Dateinamen; die alte
+Datei wird erst nach dem Commit entfernt. Bricht ein Lauf ab, bleibt der
+bisherige Stand damit gültig.
+"""
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from collections import namedtuple
+from datetime import datetime
+from functools import lru_cache
+from flask import current_app
+from sqlalchemy import func
+from app import db
+from app.models import CareEntry, EntryArchive
+from app.partitions import month_start, add_months
+
+FIELDS = ('id', 'client_id', 'category', 'description', 'recorded_by', 'recorded_at', 'created_at')
+
+# Einträge pro DELETE-Statement
+DELETE_BATCH = 1000
+
+
+class ArchivedEntry(namedtuple('ArchivedEntry', FIELDS)):
+    """Ein Pflegeeintrag aus dem Archiv (nur lesbar)."""
+
+    archived = True
+
+    @property
+    def category_display(self):
+        return CareEntry.category_label(self.category)
+
+
+def entry_key(entry):
+    """Sortierschlüssel (recorded_at, id), passend zur Keyset-Pagination."""
+    return entry.recorded_at, entry.id
+
+
+def _archive_dir():
+    return current_app.config['ARCHIVE_DIR']
+
+
+def _to_json(entry):
+    data = {field: getattr(entry, field) for field in FIELDS}
+    for field in ('recorded_at', 'created_at'):
+        if data[field] is not None:
+            data[field] = data[field].isoformat()
+    return json.dumps(data, ensure_ascii=False)
+
+
+def _from_json(line):
+    data = json.loads(line)
+    for field in ('recorded_at', 'created_at'):
+        if data[field] is not None:
+            data[field] = datetime.fromisoformat(data[field])
+    return ArchivedEntry(**data)
+
+
+@lru_cache(maxsize=32)
+def _read_file(path, sha256):
+    # sha256 gehört zum Cache-Schlüssel: eine neue Fassung ist ein neuer Eintrag
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return tuple(_from_json(line) for line in f if line.strip())
+
+
+def read_archive(archive):
+    """Alle Einträge eines archivierten Monats, neueste zuerst."""
+    return _read_file(os.path.join(_archive_dir(), archive.path), archive.sha256)
+
+
+def iter_archive(archive):
+    """
+    Einträge eines archivierten Monats zeilenweise, neueste zuerst.
+
+    Ohne Cache und ohne die Datei vollständig zu laden - für Exporte, die
+    sehr viele Monatsdateien nur einmal lesen.
+    """
+    with gzip.open(os.path.join(_archive_dir(), archive.path), 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield _from_json(line)
+
+
+def archived_entries(client_id, newer_than=None, older_than=None, newest_first=True):
+    """
+    Archivierte Einträge eines Klienten in Sortierreihenfolge.
+
+    Args:
+        client_id: ID des Klienten
+        newer_than, older_than: optionale Schlüssel (recorded_at, id), exklusiv
+        newest_first: absteigend (Standard) oder aufsteigend sortiert
+
+    Yields:
+        ArchivedEntry; Dateien werden erst gelesen, wenn sie gebraucht werden
+    """
+    query = EntryArchive.query.filter(EntryArchive.client_id == client_id)
+    if newer_than:
+        query = query.filter(EntryArchive.last_recorded_at >= newer_than[0])
+    if older_than:
+        query = query.filter(EntryArchive.first_recorded_at <= older_than[0])
+    order = EntryArchive.month.desc() if newest_first else EntryArchive.month.asc()
+
+    for archive in query.order_by(order).all():
+        entries = read_archive(archive)
+        for entry in (entries if newest_first else reversed(entries)):
+            key = entry_key(entry)
+            if newer_than and key <= newer_than:
+                if newest_first:
+                    break
+                continue
+            if older_than and key >= older_than:
+                if newest_first:
+                    continue
+                break
+            yield entry
+
+
+def archived_count(client_id, date_from=None, date_to=None):
+    """Anzahl archivierter Einträge im Zeitraum [date_from, date_to)."""
+    total = 0
+    query = EntryArchive.query.filter(EntryArchive.client_id == client_id)
+    if date_from:
+        query = query.filter(EntryArchive.last_recorded_at >= date_from)
+    if date_to:
+        query = query.filter(EntryArchive.first_recorded_at < date_to)
+    for archive in query:
+        if (date_from is None or archive.first_recorded_at >= date_from) and \
+                (date_to is None or archive.last_recorded_at < date_to):
+            total += archive.entry_count
+        else:
+            total += sum(1 for entry in read_archive(archive)
+                         if (date_from is None or entry.recorded_at >= date_from)
+                         and (date_to is None or entry.recorded_at < date_to))
+    return total
+
+
+# --- Archivierung --------------------------------------------------------------
+
+def _write_file(client_id, month, entries):
+    """Schreibt die Einträge komprimiert und atomar; liefert (Pfad, Größe, SHA-256)."""
+    directory = os.path.join(_archive_dir(), str(client_id))
+    os.makedirs(directory, exist_ok=True)
+    payload = '\n'.join(_to_json(entry) for entry in entries).encode('utf-8') + b'\n'
+    # mtime=0: gleicher Inhalt ergibt dieselbe Datei und dieselbe Prüfsumme
+    data = gzip.compress(payload, mtime=0)
+    sha256 = hashlib.sha256(data).hexdigest()
+
+    relative = os.path.join(str(client_id), f'{month:%Y-%m}-{sha256[:12]}.jsonl.gz')
+    fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, os.path.join(_archive_dir(), relative))
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return relative, len(data), sha256
+
+
+def _archive_month(client_id, month, entries):
+    """Archiviert die Einträge eines Monats; ein bestehendes Archiv wird ergänzt."""
+    ids = [entry.id for entry in entries]
+    archive = EntryArchive.query.filter_by(client_id=client_id, month=month).first()
+    old_path = None
+    if archive is not None:
+        known = set(ids)
+        entries = entries + [entry for entry in read_archive(archive) if entry.id not in known]
+        entries.sort(key=entry_key, reverse=True)
+        old_path = archive.path
+    else:
+        archive = EntryArchive(client_id=client_id, month=month)
+        db.session.add(archive)
+
+    path, size, sha256 = _write_file(client_id, month, entries)
+    archive.path = path
+    archive.size_bytes = size
+    archive.sha256 = sha256
+    archive.entry_count = len(entries)
+    archive.first_recorded_at = entries[-1].recorded_at
+    archive.last_recorded_at = entries[0].recorded_at
+
+    for start in range(0, len(ids), DELETE_BATCH):
+        CareEntry.query.filter(
+            CareEntry.client_id == client_id, CareEntry.id.in_(ids[start:start + DELETE_BATCH])
+        ).delete(synchronize_session=False)
+    db.session.commit()
+
+    if old_path and old_path != path:
+        try:
+            os.unlink(os.path.join(_archive_dir(), old_path))
+        except FileNotFoundError:
+            pass
+
+
+def remove_client_files(client_id):
+    """Löscht alle Archivdateien eines Klienten (nach dem Löschen der Manifeste)."""
+    shutil.rmtree(os.path.join(_archive_dir(), str(client_id)), ignore_errors=True)
+
+
+def archive_entries(cutoff, client_ids=None, progress=None):
+    """
+    Verschiebt alle Einträge vor cutoff ins Archiv.
+
+    Args:
+        cutoff: Stichtag (datetime), üblicherweise ein Monatsanfang
+        client_ids: optional nur diese Klienten
+        progress: Optionaler Callback (client_id, Monat, Anzahl)
+
+    Returns:
+        tuple: (archivierte Monate, archivierte Einträge)
+    """
+    query = db.session.query(CareEntry.client_id).filter(CareEntry.recorded_at < cutoff)
+    if client_ids:
+        query = query.filter(CareEntry.client_id.in_(client_ids))
+    pending = sorted(client_id for client_id, in query.distinct())
+
+    months = 0
+    total = 0
+    for client_id in pending:
+        # Monat für Monat: im Speicher liegt nie mehr als ein Monat eines Klienten
+        month = _next_month(client_id, None, cutoff)
+        while month is not None:
+            following = add_months(month, 1)
+            lower = datetime.combine(month, datetime.min.time())
+            upper = min(datetime.combine(following, datetime.min.time()), cutoff)
+            rows = db.session.query(*(getattr(CareEntry, field) for field in FIELDS)).filter(
+                CareEntry.client_id == client_id,
+                CareEntry.recorded_at >= lower, CareEntry.recorded_at < upper
+            ).order_by(CareEntry.recorded_at.desc(), CareEntry.id.desc())
+            entries = [ArchivedEntry(*row) for row in rows]
+            if entries:
+                _archive_month(client_id, month, entries)
+                months += 1
+                total += len(entries)
+                if progress:
+                    progress(client_id, month, len(entries))
+            month = _next_month(client_id, upper, cutoff)
+    return months, total
+
+
+def _next_month(client_id, after, cutoff):
+    """Erster Monat ab after (inklusive) mit Einträgen vor cutoff, oder None."""
+    query = db.session.query(func.min(CareEntry.recorded_at)).filter(
+        CareEntry.client_id == client_id, CareEntry.recorded_at < cutoff
+    )
+    if after is not None:
+        query = query.filter(CareEntry.recorded_at >= after)
+    first = query.scalar()
+    return month_start(first.date()) if first else None
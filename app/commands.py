@@ -0,0 +1,210 @@
+"""
+CLI-Befehle (flask ...).
+"""
+from datetime import datetime, timedelta
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from app.models import CareEntry
+from app.stats import invalidate_dashboard_stats
+
+data_cli = AppGroup('data', help='Testdaten erzeugen.')
+
+
+@data_cli.command('generate')
+@click.option('--clients', default=100, show_default=True, help='Anzahl Klienten.')
+@click.option('--entries', 'entries_per_client', default=1000, show_default=True,
+              help='Pflegeeinträge pro Klient.')
+@click.option('--seed', default=0, show_default=True, help='Zufalls-Seed.')
+@click.option('--end', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+              help='Letzter Tag des Zeitraums (Standard: heute).')
+@click.option('--days', default=365, show_default=True, help='Länge des Zeitraums in Tagen.')
+@click.option('--batch-size', default=10000, show_default=True,
+              help='Zeilen pro COPY bzw. executemany.')
+def generate_command(clients, entries_per_client, seed, end, days, batch_size):
+    """Erzeugt synthetische Klienten und Pflegeeinträge (deterministisch je Seed)."""
+    from app.datagen import generate
+
+    started = datetime.now()
+
+    def progress(done):
+        click.echo(f'  {done}/{clients} Klienten')
+
+    client_count, entry_count = generate(
+        clients, entries_per_client, seed=seed, end=end.date() if end else None,
+        days=days, batch_size=batch_size, progress=progress
+    )
+    # COPY läuft an den ORM-Events vorbei
+    invalidate_dashboard_stats()
+
+    # Rückdatierte Einträge ohne eigene Partition liegen in der Default-Partition
+    from app.partitions import is_partitioned, ensure_partitions
+    if is_partitioned():
+        for name, moved in ensure_partitions(months_ahead=current_app.config['PARTITION_MONTHS_AHEAD']):
+            click.echo(f'  Partition {name} angelegt ({moved} Zeilen übernommen).')
+
+    seconds = (datetime.now() - started).total_seconds()
+    click.echo(f'{client_count} Klienten und {entry_count} Pflegeeinträge in {seconds:.1f}s erzeugt.')
+
+
+partitions_cli = AppGroup('partitions', help='Monats-Partitionen von care_entries (PostgreSQL).')
+
+
+def _require_partitioned():
+    from app.partitions import is_partitioned
+    if not is_partitioned():
+        raise click.ClickException('care_entries ist auf dieser Datenbank nicht partitioniert '
+                                   '(nur PostgreSQL nach `flask db upgrade`).')
+
+
+def _format_size(size):
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if size < 1024 or unit == 'GiB':
+            return f'{size:.0f} {unit}' if unit == 'B' else f'{size:.1f} {unit}'
+        size /= 1024
+
+
+def _print_report():
+    from app.partitions import partition_report
+
+    total = 0
+    for partition in partition_report():
+        total += partition.size_bytes
+        click.echo(f'  {partition.name:<26} {partition.rows:>12,} Zeilen  '
+                   f'{_format_size(partition.size_bytes):>10}  {partition.bounds}')
+    click.echo(f'  Gesamt: {_format_size(total)}')
+
+
+@partitions_cli.command('ensure')
+@click.option('--months', type=int, default=None,
+              help='Monate im Voraus (Standard: PARTITION_MONTHS_AHEAD).')
+def ensure_command(months):
+    """Legt fehlende Partitionen an (einige Monate voraus und für Zeilen in der Default-Partition)."""
+    from app.partitions import ensure_partitions
+
+    _require_partitioned()
+    if months is None:
+        months = current_app.config['PARTITION_MONTHS_AHEAD']
+    for name, moved in ensure_partitions(months_ahead=months):
+        note = f' ({moved} Zeilen aus der Default-Partition übernommen)' if moved else ''
+        click.echo(f'Partition {name} angelegt{note}.')
+    _print_report()
+
+
+@partitions_cli.command('report')
+def report_command():
+    """Zeigt alle Partitionen mit Zeilenzahl (geschätzt) und Größe."""
+    _require_partitioned()
+    _print_report()
+
+
+@partitions_cli.command('detach')
+@click.argument('month', type=click.DateTime(formats=['%Y-%m']))
+def detach_command(month):
+    """Löst die Partition eines Monats (JJJJ-MM) aus care_entries."""
+    from app import db
+    from app.activity import rebuild
+    from app.partitions import detach_partition
+
+    _require_partitioned()
+    try:
+        name = detach_partition(month.date())
+    except LookupError as exc:
+        raise click.ClickException(str(exc))
+    # Einträge verschwinden ohne ORM-Events aus der Tabelle
+    invalidate_dashboard_stats()
+    rebuild()
+    db.session.commit()
+    click.echo(f'Partition {name} gelöst; die Tabelle bleibt bestehen und kann archiviert werden.')
+
+
+archive_cli = AppGroup('archive', help='Alte Pflegeeinträge archivieren.')
+
+
+@archive_cli.command('run')
+@click.option('--before', type=click.DateTime(formats=['%Y-%m']), default=None,
+              help='Einträge vor diesem Monat (JJJJ-MM) archivieren '
+                   '(Standard: älter als ARCHIVE_AFTER_MONTHS Monate).')
+@click.option('--client', 'client_ids', type=int, multiple=True, help='Nur diese Klienten-IDs.')
+def archive_run_command(before, client_ids):
+    """Verschiebt alte Pflegeeinträge pro Klient und Monat ins Archiv."""
+    from app.archive import archive_entries
+    from app.partitions import add_months, month_start
+
+    if before is None:
+        cutoff = add_months(month_start(datetime.now().date()),
+                            -current_app.config['ARCHIVE_AFTER_MONTHS'])
+        before = datetime.combine(cutoff, datetime.min.time())
+
+    def progress(client_id, month, count):
+        click.echo(f'  Klient {client_id}: {month:%Y-%m} ({count} Einträge)')
+
+    click.echo(f'Archiviere Einträge vor {before:%Y-%m} ...')
+    months, entries = archive_entries(before, client_ids=list(client_ids) or None, progress=progress)
+    click.echo(f'{entries} Einträge in {months} Monatsarchiven abgelegt.')
+
+
+@archive_cli.command('status')
+def archive_status_command():
+    """Zeigt Umfang und Zeitraum des Archivs."""
+    from sqlalchemy import func
+    from app import db
+    from app.models import EntryArchive
+
+    files, entries, size, first, last = db.session.query(
+        func.count(EntryArchive.id), func.coalesce(func.sum(EntryArchive.entry_count), 0),
+        func.coalesce(func.sum(EntryArchive.size_bytes), 0),
+        func.min(EntryArchive.month), func.max(EntryArchive.month)
+    ).one()
+    if not files:
+        click.echo('Das Archiv ist leer.')
+        return
+    click.echo(f'{entries} Einträge in {files} Dateien ({_format_size(size)}), '
+               f'{first:%Y-%m} bis {last:%Y-%m}.')
+
+
+export_cli = AppGroup('export', help='Tabellarische Exporte.')
+
+
+@export_cli.command('entries')
+@click.option('--from', 'date_from', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+              help='Erster Tag (JJJJ-MM-TT).')
+@click.option('--to', 'date_to', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+              help='Letzter Tag (JJJJ-MM-TT, inklusive).')
+@click.option('--category', type=click.Choice([key for key, _ in CareEntry.CATEGORIES]), default=None,
+              help='Nur diese Kategorie.')
+@click.option('--recorded-by', default=None, help='Nur Einträge dieser Mitarbeiterin/dieses Mitarbeiters.')
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'xlsx']), default='csv', show_default=True)
+@click.option('--output', '-o', type=click.File('wb'), default='-', show_default=True,
+              help='Zieldatei ("-" für stdout).')
+def export_entries_command(date_from, date_to, category, recorded_by, fmt, output):
+    """Exportiert Pflegeeinträge aller Klienten als CSV oder XLSX."""
+    from app.entry_export import EntryFilter, iter_export
+
+    if date_from and date_to and date_to < date_from:
+        raise click.BadParameter('Das Enddatum muss nach dem Startdatum liegen.', param_hint='--to')
+    selection = EntryFilter(
+        date_from=date_from,
+        date_to=date_to + timedelta(days=1) if date_to else None,
+        category=category,
+        recorded_by=recorded_by,
+    )
+    for block in iter_export(selection, fmt):
+        output.write(block)
+
+
+activity_cli = AppGroup('activity', help='Aktivitätsübersicht der Klienten (client_activity).')
+
+
+@activity_cli.command('rebuild')
+@click.option('--client', 'client_ids', type=int, multiple=True, help='Nur diese Klienten-IDs.')
+def activity_rebuild_command(client_ids):
+    """Berechnet die Aktivitätsübersicht aus Einträgen und Archiv neu."""
+    from app import db
+    from app.activity import rebuild
+
+    started = datetime.now()
+    count = rebuild(list(client_ids) or None)
+    db.session.commit()
+    seconds = (datetime.now() - started).total_seconds()
+    click.echo(f'Aktivität für {count} Klienten in {seconds:.1f}s neu berechnet.')
@@ -0,0 +1,169 @@
+"""
+Generator für synthetische Testdaten (Kapazitätsplanung, Lasttests).
+
+Erzeugt N Klienten mit je M Pflegeeinträgen. Kategorien, Beschreibungen und
+Mitarbeiter stammen aus den Demo-Einträgen in app/demo_data.py, die
+Verteilung der Kategorien entspricht deren Mischung. Bei gleichem Seed und
+gleichem Enddatum entstehen exakt dieselben Daten.
+
+Einträge werden auf PostgreSQL per COPY geladen, sonst per executemany.
+"""
+import csv
+import io
+import random
+from collections import Counter
+from datetime import date, datetime, timedelta
+from sqlalchemy import insert
+from app import db
+from app.models import Client, CareEntry
+from app.activity import rebuild as rebuild_activity
+from app.demo_data import CLIENTS, ENTRIES
+
+FIRST_NAMES = [
+    'Maria', 'Johann', 'Elisabeth', 'Franz', 'Anna', 'Josef', 'Theresia', 'Karl',
+    'Hildegard', 'Friedrich', 'Gertrude', 'Leopold', 'Margarete', 'Alois', 'Rosa',
+    'Herbert', 'Ingrid', 'Walter', 'Helga', 'Rudolf',
+]
+LAST_NAMES = [
+    'Huber', 'Schmidt', 'Bauer', 'Müller', 'Gruber', 'Wagner', 'Pichler', 'Steiner',
+    'Moser', 'Mayer', 'Hofer', 'Leitner', 'Berger', 'Fuchs', 'Eder', 'Fischer',
+    'Schwarz', 'Weber', 'Schneider', 'Reiter',
+]
+
+ENTRY_COLUMNS = ('client_id', 'category', 'description', 'recorded_by', 'recorded_at', 'created_at')
+
+
+class Generator:
+    """Deterministischer Zufallsgenerator für Klienten und Pflegeeinträge."""
+
+    def __init__(self, seed=0, end=None, days=365):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.end = datetime.combine(end or date.today(), datetime.min.time())
+        self.span = timedelta(days=days).total_seconds()
+
+        mix = Counter(entry['category'] for entry in ENTRIES)
+        self.categories = sorted(mix)
+        self.category_weights = [mix[category] for category in self.categories]
+        self.descriptions = {
+            category: [entry['description'] for entry in ENTRIES if entry['category'] == category]
+            for category in self.categories
+        }
+        self.staff = sorted({entry['recorded_by'] for entry in ENTRIES})
+        self.cities = [client['address'].split(', ', 1)[1] for client in CLIENTS]
+        self.notes = [client['notes'] for client in CLIENTS]
+
+    def client(self):
+        rng = self.rng
+        return {
+            'name': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+            'birth_date': date(1925, 1, 1) + timedelta(days=rng.randrange(365 * 40)),
+            'address': f'{rng.choice(LAST_NAMES)}gasse {rng.randint(1, 120)}, {rng.choice(self.cities)}',
+            'care_level': rng.choice([None, 1, 2, 3, 3, 4, 4, 5]),
+            'notes': rng.choice(self.notes),
+        }
+
+    def entries(self, client_id, index, count):
+        """
+        Einträge des index-ten Klienten, zeitlich aufsteigend über den Zeitraum verteilt.
+
+        Eigener Zufallsstrom pro Klient, damit das Ergebnis nicht von der
+        Blockgröße abhängt.
+        """
+        rng = random.Random(f'{self.seed}:{index}')
+        offsets = sorted(rng.random() * self.span for _ in range(count))
+        start = self.end - timedelta(seconds=self.span)
+        for offset in offsets:
+            category = rng.choices(self.categories, self.category_weights)[0]
+            recorded_at = start + timedelta(seconds=int(offset))
+            yield {
+                'client_id': client_id,
+                'category': category,
+                'description': rng.choice(self.descriptions[category]),
+                'recorded_by': rng.choice(self.staff),
+                'recorded_at': recorded_at,
+                'created_at': recorded_at,
+            }
+
+
+def _copy_entries(rows, batch_size):
+    """Lädt Einträge per COPY FROM STDIN (PostgreSQL), blockweise."""
+    connection = db.session.connection().connection.dbapi_connection
+    columns = ', '.join(ENTRY_COLUMNS)
+
+    def flush(buffer):
+        buffer.seek(0)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(f'COPY care_entries ({columns}) FROM STDIN WITH (FORMAT csv)', buffer)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    pending = 0
+    for row in rows:
+        writer.writerow([row[column] for column in ENTRY_COLUMNS])
+        pending += 1
+        if pending >= batch_size:
+            flush(buffer)
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            pending = 0
+    if pending:
+        flush(buffer)
+
+
+def _insert_entries(rows, batch_size):
+    """Lädt Einträge per executemany, blockweise."""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.session.execute(insert(CareEntry), batch)
+            batch = []
+    if batch:
+        db.session.execute(insert(CareEntry), batch)
+
+
+def generate(clients, entries_per_client, seed=0, end=None, days=365, batch_size=10000,
+             progress=None):
+    """
+    Erzeugt Klienten und Pflegeeinträge in der aktuellen Datenbank.
+
+    Args:
+        clients: Anzahl Klienten
+        entries_per_client: Einträge pro Klient
+        seed: Zufalls-Seed
+        end: Letzter Tag des Zeitraums (Standard: heute)
+        days: Länge des Zeitraums in Tagen
+        batch_size: Zeilen pro COPY bzw. executemany
+        progress: Optionaler Callback (erzeugte Klienten)
+
+    Returns:
+        tuple: (Anzahl Klienten, Anzahl Einträge)
+    """
+    generator = Generator(seed=seed, end=end, days=days)
+    use_copy = db.session.get_bind().dialect.name == 'postgresql'
+    load = _copy_entries if use_copy else _insert_entries
+
+    total_entries = 0
+    done = 0
+    # Klienten blockweise anlegen, Einträge direkt danach laden
+    client_batch = max(1, batch_size // max(entries_per_client, 1))
+    while done < clients:
+        batch = [generator.client() for _ in range(min(client_batch, clients - done))]
+        client_ids = db.session.scalars(
+            insert(Client).returning(Client.id, sort_by_parameter_order=True), batch
+        ).all()
+
+        rows = (row for index, client_id in enumerate(client_ids, start=done)
+                for row in generator.entries(client_id, index, entries_per_client))
+        load(rows, batch_size)
+        # Weder COPY noch executemany lösen ORM-Events aus
+        rebuild_activity(client_ids)
+        db.session.commit()
+
+        done += len(client_ids)
+        total_entries += len(client_ids) * entries_per_client
+        if progress:
+            progress(done)
+
+    return done, total_entries
@@ -0,0 +1,184 @@
+"""
+Lese-/Schreibtrennung mit optionalem Read-Replica.
+
+Ist REPLICA_DATABASE_URL gesetzt, bekommt Flask-SQLAlchemy eine zweite
+Engine (Bind 'replica'). Views mit @read_only lesen bei GET/HEAD-Requests
+vom Replica, alles andere - Schreib-Routen, Flushes, INSERT/UPDATE/DELETE -
+geht an die Primärdatenbank.
+
+Read-your-writes: Schreibt ein Request, liest derselbe Request danach nur
+noch von der Primärdatenbank, und die Sitzung des Benutzers bleibt
+REPLICA_PIN_SECONDS lang daran gebunden (z.B. die Detailseite nach dem
+Redirect von "Eintrag speichern").
+
+Das Replica wird höchstens alle REPLICA_CHECK_INTERVAL Sekunden pro Worker
+geprüft. Ist es nicht erreichbar oder hängt es mehr als REPLICA_MAX_LAG
+Sekunden hinterher, wird bis zur nächsten Prüfung die Primärdatenbank
+verwendet.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from flask import current_app, g, has_app_context, request, session
+from flask_sqlalchemy.session import Session as FlaskSession
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+REPLICA = 'replica'
+PRIMARY = 'primary'
+PIN_KEY = 'db_primary_until'
+
+# Auf dem Replica: 0, wenn alles WAL eingespielt ist, sonst Alter der letzten Transaktion
+LAG_QUERY = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+_lock = threading.Lock()
+_health = {'checked': None, 'available': False}
+
+
+class RoutingSession(FlaskSession):
+    """Session, die reine SELECTs auf das Replica lenkt, wenn der Request es erlaubt."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and isinstance(clause, Select) \
+                and _current_route() == REPLICA:
+            return self._db.engines[REPLICA]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def read_only(view):
+    """Markiert eine View als reine Lese-View (darf vom Replica lesen)."""
+    view.read_only = True
+    return view
+
+
+def _current_route():
+    if not has_app_context():
+        return PRIMARY
+    return g.get('db_route', PRIMARY)
+
+
+def replica_configured():
+    return has_app_context() and REPLICA in current_app.config.get('SQLALCHEMY_BINDS', {})
+
+
+def reading_from_replica():
+    """True, wenn SELECTs im aktuellen Kontext an das Replica gehen."""
+    return _current_route() == REPLICA
+
+
+def _replica_lag(engine):
+    with engine.connect() as connection:
+        if connection.dialect.name == 'postgresql':
+            return float(connection.execute(LAG_QUERY).scalar())
+        connection.execute(text('SELECT 1'))
+        return 0.0
+
+
+def replica_available():
+    """Prüft Erreichbarkeit und Verzögerung des Replicas (gecacht pro Worker)."""
+    if not replica_configured():
+        return False
+    config = current_app.config
+    now = time.monotonic()
+    with _lock:
+        checked = _health['checked']
+        if checked is not None and now - checked < config['REPLICA_CHECK_INTERVAL']:
+            return _health['available']
+        # Andere Threads verwenden bis zum Ergebnis den bisherigen Stand
+        _health['checked'] = now
+
+    from app import db
+    try:
+        lag = _replica_lag(db.engines[REPLICA])
+        available = lag <= config['REPLICA_MAX_LAG']
+        if not available:
+            current_app.logger.warning(f'Replica hängt {lag:.1f} s hinterher, lese von der Primärdatenbank')
+    except Exception as exc:
+        current_app.logger.warning(f'Replica nicht erreichbar, lese von der Primärdatenbank: {exc}')
+        available = False
+
+    with _lock:
+        _health['available'] = available
+    return available
+
+
+@contextmanager
+def replica_reads():
+    """Liest im Block vom Replica, sofern es verfügbar ist (z.B. im Export-Pool)."""
+    previous = g.get('db_route')
+    if replica_available():
+        g.db_route = REPLICA
+    try:
+        yield
+    finally:
+        if previous is None:
+            g.pop('db_route', None)
+        else:
+            g.db_route = previous
+
+
+@contextmanager
+def primary_reads():
+    """Liest im Block von der Primärdatenbank, auch in @read_only-Views."""
+    previous = g.get('db_route')
+    g.db_route = PRIMARY
+    try:
+        yield
+    finally:
+        if previous is None:
+            g.pop('db_route', None)
+        else:
+            g.db_route = previous
+
+
+# --- Request-Routing ---------------------------------------------------------
+
+def _choose_route():
+    view = current_app.view_functions.get(request.endpoint)
+    if view is None or not getattr(view, 'read_only', False):
+        return
+    if request.method not in ('GET', 'HEAD'):
+        return
+    if session.get(PIN_KEY, 0) > time.time():
+        return
+    if replica_available():
+        g.db_route = REPLICA
+
+
+def _pin_after_write(response):
+    if g.get('db_wrote'):
+        session[PIN_KEY] = time.time() + current_app.config['REPLICA_PIN_SECONDS']
+    elif PIN_KEY in session and session[PIN_KEY] <= time.time():
+        session.pop(PIN_KEY)
+    return response
+
+
+def _mark_write(session_):
+    if has_app_context():
+        g.db_wrote = True
+        # Ab jetzt liest dieser Request seine eigenen Änderungen
+        g.db_route = PRIMARY
+
+
+@event.listens_for(Session, 'after_flush')
+def _on_flush(session_, flush_context):
+    _mark_write(session_)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _on_bulk_write(orm_execute_state):
+    if not orm_execute_state.is_select:
+        _mark_write(orm_execute_state.session)
+
+
+def init_app(app):
+    """Aktiviert das Routing, wenn ein Replica konfiguriert ist."""
+    if REPLICA not in app.config.get('SQLALCHEMY_BINDS', {}):
+        return
+    app.before_request(_choose_route)
+    app.after_request(_pin_after_write)
@@ -0,0 +1,430 @@
+"""
+Tabellarischer Export aller Pflegeeinträge (Abrechnung, Qualitätssicherung).
+
+Die Einträge aller Klienten eines Zeitraums - optional gefiltert nach
+Kategorie und "Erfasst von" - werden als CSV oder XLSX erzeugt und Zeile für
+Zeile als Folge von Byte-Blöcken geliefert, für den Download ebenso wie für
+`flask export entries`.
+
+Der Zeitraum wird Monat für Monat gelesen: Die Tabelle per Server-Side-Cursor
+(yield_per; auf PostgreSQL mit Partitionen trifft jede Abfrage genau eine
+Partition), archivierte Monate aus app/archive.py dazugemischt. Die
+Archivdateien eines Monats werden zeilenweise per heapq.merge
+zusammengeführt; da sie absteigend sortiert sind, läuft das Ergebnis über
+eine Temp-Datei, die rückwärts gelesen wird. Im Speicher liegen damit
+höchstens ein Block der Tabelle und je Archivdatei eine Zeile - unabhängig
+von der Gesamtzahl der Zeilen. Die Reihenfolge ist aufsteigend nach
+(recorded_at, id).
+
+XLSX wird ohne Zusatzbibliothek direkt als ZIP gestreamt (Inline-Strings,
+ein Tabellenblatt je 1.048.575 Zeilen).
+"""
+import csv
+import json
+import os
+import re
+import tempfile
+import zipfile
+from collections import namedtuple
+from datetime import datetime, timedelta
+from heapq import merge
+from io import StringIO
+from itertools import chain, islice
+from xml.sax.saxutils import escape, quoteattr
+from flask import current_app
+from sqlalchemy import func
+from app import db
+from app.models import Client, CareEntry, EntryArchive
+from app.archive import iter_archive, entry_key
+from app.db_routing import replica_reads
+from app.exports import ZipStream
+from app.partitions import month_start, add_months
+from app.startup import heartbeat
+
+FORMATS = ('csv', 'xlsx')
+MIMETYPES = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+HEADER = ('ID', 'Klient-ID', 'Klient', 'Kategorie', 'Beschreibung', 'Erfasst von',
+          'Erfasst am', 'Angelegt am')
+
+# Excel: 1.048.576 Zeilen pro Blatt, davon eine Kopfzeile; 32.767 Zeichen pro Zelle
+XLSX_SHEET_ROWS = 1048575
+XLSX_CELL_LENGTH = 32767
+
+
+class ExportRow(namedtuple('ExportRow', [
+    'id', 'client_id', 'client_name', 'category', 'description', 'recorded_by',
+    'recorded_at', 'created_at'
+])):
+    """Ein Pflegeeintrag im tabellarischen Export."""
+
+
+# Felder, die in der Temp-Datei des Archivs als ISO-String stehen
+_DATETIME_FIELDS = (ExportRow._fields.index('recorded_at'), ExportRow._fields.index('created_at'))
+
+
+class EntryFilter(namedtuple('EntryFilter', 'date_from date_to category recorded_by')):
+    """
+    Auswahl für den Export.
+
+    date_from/date_to sind datetime-Werte (date_to exklusiv) oder None.
+    """
+
+    def matches(self, entry):
+        return ((self.category is None or entry.category == self.category) and
+                (self.recorded_by is None or entry.recorded_by == self.recorded_by) and
+                (self.date_from is None or entry.recorded_at >= self.date_from) and
+                (self.date_to is None or entry.recorded_at < self.date_to))
+
+
+def _months(selection):
+    """Erste Tage aller Monate, die der Export durchläuft."""
+    first = selection.date_from
+    last = selection.date_to - timedelta(microseconds=1) if selection.date_to else None
+    if first is None or last is None:
+        table_first, table_last = db.session.query(
+            func.min(CareEntry.recorded_at), func.max(CareEntry.recorded_at)
+        ).one()
+        archive_first, archive_last = db.session.query(
+            func.min(EntryArchive.first_recorded_at), func.max(EntryArchive.last_recorded_at)
+        ).one()
+        first = first or min(filter(None, (table_first, archive_first)), default=None)
+        last = last or max(filter(None, (table_last, archive_last)), default=None)
+        if first is None or last is None:
+            return
+
+    month = month_start(first.date())
+    while month <= last.date():
+        yield month
+        month = add_months(month, 1)
+
+
+def _table_rows(selection, month, chunk_size):
+    lower = datetime.combine(month, datetime.min.time())
+    upper = datetime.combine(add_months(month, 1), datetime.min.time())
+    if selection.date_from is not None:
+        lower = max(lower, selection.date_from)
+    if selection.date_to is not None:
+        upper = min(upper, selection.date_to)
+
+    query = db.session.query(
+        CareEntry.id, CareEntry.client_id, Client.name, CareEntry.category,
+        CareEntry.description, CareEntry.recorded_by, CareEntry.recorded_at, CareEntry.created_at
+    ).join(Client, CareEntry.client_id == Client.id).filter(
+        CareEntry.recorded_at >= lower, CareEntry.recorded_at < upper
+    )
+    if selection.category is not None:
+        query = query.filter(CareEntry.category == selection.category)
+    if selection.recorded_by is not None:
+        query = query.filter(CareEntry.recorded_by == selection.recorded_by)
+    for row in query.order_by(CareEntry.recorded_at, CareEntry.id).yield_per(chunk_size):
+        yield ExportRow(*row)
+
+
+def _reversed_lines(f, block_size=64 * 1024):
+    """Zeilen einer Binärdatei von hinten nach vorn, blockweise gelesen."""
+    position = f.seek(0, os.SEEK_END)
+    rest = b''
+    while position > 0:
+        size = min(block_size, position)
+        position -= size
+        f.seek(position)
+        lines = (f.read(size) + rest).split(b'\n')
+        rest = lines.pop(0)
+        for line in reversed(lines):
+            if line:
+                yield line
+    if rest:
+        yield rest
+
+
+def _spool_row(entry, name):
+    values = list(ExportRow(entry.id, entry.client_id, name, entry.category, entry.description,
+                            entry.recorded_by, entry.recorded_at, entry.created_at))
+    for index in _DATETIME_FIELDS:
+        if values[index] is not None:
+            values[index] = values[index].isoformat()
+    return json.dumps(values, ensure_ascii=False).encode('utf-8') + b'\n'
+
+
+def _unspool_row(line):
+    values = json.loads(line)
+    for index in _DATETIME_FIELDS:
+        if values[index] is not None:
+            values[index] = datetime.fromisoformat(values[index])
+    return ExportRow(*values)
+
+
+def _archived_rows(selection, month):
+    """
+    Passende archivierte Einträge eines Monats, aufsteigend sortiert.
+
+    Die Dateien aller Klienten werden zeilenweise absteigend gemischt und in
+    eine Temp-Datei geschrieben; geliefert wird diese rückwärts gelesen.
+    """
+    manifests = db.session.query(EntryArchive, Client.name).join(
+        Client, EntryArchive.client_id == Client.id
+    ).filter(EntryArchive.month == month).all()
+    if not manifests:
+        return iter(())
+
+    names = {archive.client_id: name for archive, name in manifests}
+    newest_first = merge(*(iter_archive(archive) for archive, _ in manifests),
+                         key=entry_key, reverse=True)
+    spool = tempfile.TemporaryFile()
+    try:
+        for entry in newest_first:
+            if selection.matches(entry):
+                spool.write(_spool_row(entry, names.get(entry.client_id)))
+    except BaseException:
+        spool.close()
+        raise
+    return _read_spool(spool)
+
+
+def _read_spool(spool):
+    with spool:
+        for line in _reversed_lines(spool):
+            yield _unspool_row(line)
+
+
+def iter_export_rows(selection, chunk_size=None):
+    """
+    Alle ausgewählten Einträge aus Tabelle und Archiv, aufsteigend nach (recorded_at, id).
+
+    Liest - wie der Export-Pool - vom Replica, sofern eines verfügbar ist.
+    """
+    chunk_size = chunk_size or current_app.config['ENTRY_EXPORT_CHUNK_SIZE']
+    with replica_reads():
+        for month in _months(selection):
+            # Archiv zuerst in die Temp-Datei schreiben, damit während des
+            # Cursors keine weitere Abfrage auf derselben Verbindung läuft
+            archived = _archived_rows(selection, month)
+            yield from merge(_table_rows(selection, month, chunk_size), archived, key=entry_key)
+
+
+def _format_datetime(value):
+    return value.strftime('%Y-%m-%d %H:%M:%S') if value else ''
+
+
+def _values(row, category_names):
+    return (row.id, row.client_id, row.client_name or '',
+            category_names.get(row.category, row.category), row.description,
+            row.recorded_by, _format_datetime(row.recorded_at), _format_datetime(row.created_at))
+
+
+# Zellen, die Excel beim Öffnen einer CSV-Datei als Formel auswertet
+_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+_CSV_TEXT_FIELDS = tuple(HEADER.index(name) for name in ('Klient', 'Beschreibung', 'Erfasst von'))
+
+
+def _csv_text(value):
+    """Freitext für CSV: Formel-Anfänge mit ' entschärfen (CSV-Injection)."""
+    if value and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _csv_values(row, category_names):
+    values = list(_values(row, category_names))
+    for index in _CSV_TEXT_FIELDS:
+        values[index] = _csv_text(values[index])
+    return values
+
+
+def iter_csv(rows, flush_rows=None):
+    """
+    CSV im Excel-tauglichen Format (UTF-8 mit BOM, Semikolon als Trenner).
+
+    Freitextfelder, die mit =, +, -, @ beginnen, bekommen ein ' vorangestellt.
+
+    Yields:
+        bytes: je etwa flush_rows Zeilen
+    """
+    flush_rows = flush_rows or current_app.config['ENTRY_EXPORT_FLUSH_ROWS']
+    category_names = dict(CareEntry.CATEGORIES)
+    buffer = StringIO()
+    writer = csv.writer(buffer, delimiter=';', lineterminator='\r\n')
+    buffer.write('\ufeff')
+    writer.writerow(HEADER)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(_csv_values(row, category_names))
+        if count % flush_rows == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+            heartbeat()
+    yield buffer.getvalue().encode('utf-8')
+
+
+# XML 1.0 erlaubt diese Zeichen nicht, auch nicht als Entity
+_INVALID_XML = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff\ud800-\udfff]')
+# Tage seit dem 30.12.1899 (Excel-Seriennummer)
+_EXCEL_EPOCH = datetime(1899, 12, 30)
+
+_XML_HEAD = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+_PACKAGE_REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.'
+
+# Stil 1: Datum mit Uhrzeit, Stil 2: fett (Kopfzeile)
+_STYLES = (
+    _XML_HEAD + f'<styleSheet xmlns="{_MAIN_NS}">'
+    '<numFmts count="1"><numFmt numFmtId="164" formatCode="dd.mm.yyyy hh:mm"/></numFmts>'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+_SHEET_HEAD = (
+    _XML_HEAD + f'<worksheet xmlns="{_MAIN_NS}"><sheetViews><sheetView workbookViewId="0">'
+    '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/>'
+    '</sheetView></sheetViews><sheetData>'
+)
+_SHEET_TAIL = '</sheetData></worksheet>'
+
+
+def _xlsx_text(value, style=''):
+    text = _INVALID_XML.sub('', str(value))[:XLSX_CELL_LENGTH]
+    return f'<c t="inlineStr"{style}><is><t xml:space="preserve">{escape(text)}</t></is></c>'
+
+
+def _xlsx_datetime(value):
+    if value is None:
+        return '<c/>'
+    return f'<c s="1"><v>{(value - _EXCEL_EPOCH).total_seconds() / 86400:.8f}</v></c>'
+
+
+def _xlsx_header():
+    return '<row r="1">' + ''.join(_xlsx_text(name, ' s="2"') for name in HEADER) + '</row>'
+
+
+def _xlsx_row(number, row, category_names):
+    return (
+        f'<row r="{number}"><c><v>{row.id}</v></c><c><v>{row.client_id}</v></c>'
+        f'{_xlsx_text(row.client_name or "")}'
+        f'{_xlsx_text(category_names.get(row.category, row.category))}'
+        f'{_xlsx_text(row.description)}{_xlsx_text(row.recorded_by)}'
+        f'{_xlsx_datetime(row.recorded_at)}{_xlsx_datetime(row.created_at)}</row>'
+    )
+
+
+def _sheet_name(number):
+    return 'Einträge' if number == 1 else f'Einträge {number}'
+
+
+def _package_parts(sheets):
+    """Die kleinen XML-Teile der Arbeitsmappe; erst am Ende bekannt (Anzahl Blätter)."""
+    overrides = ''.join(
+        f'<Override PartName="/xl/worksheets/sheet{number}.xml" '
+        f'ContentType="{_CONTENT_TYPE}worksheet+xml"/>'
+        for number in range(1, sheets + 1)
+    )
+    sheet_list = ''.join(
+        f'<sheet name={quoteattr(_sheet_name(number))} sheetId="{number}" r:id="rId{number}"/>'
+        for number in range(1, sheets + 1)
+    )
+    sheet_rels = ''.join(
+        f'<Relationship Id="rId{number}" Type="{_REL_NS}/worksheet" '
+        f'Target="worksheets/sheet{number}.xml"/>'
+        for number in range(1, sheets + 1)
+    )
+    return {
+        '[Content_Types].xml': (
+            _XML_HEAD + '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            f'<Override PartName="/xl/workbook.xml" ContentType="{_CONTENT_TYPE}sheet.main+xml"/>'
+            f'<Override PartName="/xl/styles.xml" ContentType="{_CONTENT_TYPE}styles+xml"/>'
+            f'{overrides}</Types>'
+        ),
+        '_rels/.rels': (
+            _XML_HEAD + f'<Relationships xmlns="{_PACKAGE_REL_NS}">'
+            f'<Relationship Id="rId1" Type="{_REL_NS}/officeDocument" Target="xl/workbook.xml"/>'
+            '</Relationships>'
+        ),
+        'xl/workbook.xml': (
+            _XML_HEAD + f'<workbook xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}">'
+            f'<sheets>{sheet_list}</sheets></workbook>'
+        ),
+        'xl/_rels/workbook.xml.rels': (
+            _XML_HEAD + f'<Relationships xmlns="{_PACKAGE_REL_NS}">{sheet_rels}'
+            f'<Relationship Id="rId{sheets + 1}" Type="{_REL_NS}/styles" Target="styles.xml"/>'
+            '</Relationships>'
+        ),
+        'xl/styles.xml': _STYLES,
+    }
+
+
+def iter_xlsx(rows, flush_rows=None, sheet_rows=XLSX_SHEET_ROWS):
+    """
+    XLSX-Arbeitsmappe, als ZIP gestreamt.
+
+    Die Tabellenblätter werden zuerst geschrieben, Arbeitsmappe und
+    Beziehungen zuletzt - erst dann steht die Anzahl der Blätter fest.
+
+    Yields:
+        bytes: je etwa flush_rows Zeilen (komprimiert)
+    """
+    flush_rows = flush_rows or current_app.config['ENTRY_EXPORT_FLUSH_ROWS']
+    category_names = dict(CareEntry.CATEGORIES)
+    stream = ZipStream()
+    pending = iter(rows)
+    sheets = 0
+    with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        while True:
+            sheets += 1
+            # force_zip64: Größe vorab unbekannt, ein volles Blatt kann 2 GiB überschreiten
+            with archive.open(f'xl/worksheets/sheet{sheets}.xml', 'w', force_zip64=True) as sheet:
+                buffer = [_SHEET_HEAD, _xlsx_header()]
+                for number, row in enumerate(islice(pending, sheet_rows), start=2):
+                    buffer.append(_xlsx_row(number, row, category_names))
+                    if len(buffer) >= flush_rows:
+                        sheet.write(''.join(buffer).encode('utf-8'))
+                        buffer = []
+                        yield stream.drain()
+                        heartbeat()
+                buffer.append(_SHEET_TAIL)
+                sheet.write(''.join(buffer).encode('utf-8'))
+            yield stream.drain()
+
+            following = next(pending, None)
+            if following is None:
+                break
+            pending = chain([following], pending)
+
+        for name, content in _package_parts(sheets).items():
+            archive.writestr(name, content)
+    yield stream.drain()
+
+
+def iter_export(selection, fmt='csv'):
+    """Export als Folge von Byte-Blöcken im gewünschten Format."""
+    rows = iter_export_rows(selection)
+    if fmt == 'xlsx':
+        return iter_xlsx(rows)
+    return iter_csv(rows)
+
+
+def export_filename(selection, fmt='csv'):
+    parts = ['Pflegeeintraege']
+    if selection.date_from is not None:
+        parts.append(selection.date_from.strftime('%Y%m%d'))
+    if selection.date_to is not None:
+        # date_to ist exklusiv
+        parts.append((selection.date_to - timedelta(days=1)).strftime('%Y%m%d'))
+    if len(parts) == 1:
+        parts.append(datetime.now().strftime('%Y%m%d'))
+    return f"{'_'.join(parts)}.{fmt}"
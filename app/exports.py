@@ -0,0 +1,405 @@
+"""
+Hintergrund-Export von Pflegeberichten.
+
+PDFs werden in einem lokalen Prozess-Pool gerendert (kein externer Broker
+nötig) und auf der Platte unter einem inhaltsbasierten Schlüssel abgelegt.
+Der Schlüssel ergibt sich aus der Klienten-ID, dem Zeitraum, Client.updated_at,
+Anzahl und neuester ID der Pflegeeinträge sowie dem Datum (der Bericht druckt
+Alter und Erstellungsdatum) - ein unveränderter Klient wird daher am selben
+Tag nie erneut gerendert.
+
+Der Job-Status liegt ebenfalls als Datei im Cache-Verzeichnis, damit alle
+gunicorn-Worker denselben Stand sehen.
+
+Für den Monatsabschluss rendert iter_bulk_zip() beliebig viele Berichte
+parallel im selben Pool und streamt sie als ZIP-Archiv.
+"""
+import glob
+import hashlib
+import multiprocessing
+import os
+import re
+import tempfile
+import time
+import zipfile
+from collections import namedtuple
+from datetime import date
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from heapq import merge
+from flask import current_app
+from sqlalchemy import func, true
+from app import db, create_app
+from app.models import Client, CareEntry, EntryArchive
+from app.metrics import observe_report
+from app.db_routing import replica_reads, primary_reads
+from app.archive import archived_entries, archived_count, entry_key
+
+JOB_ID_PATTERN = re.compile(r'^(\d+)-([0-9a-f]{64})$')
+# Hex-Zeichen der Job-ID, die den Zeitraum kennzeichnen
+SCOPE_LENGTH = 16
+
+_executor = None
+_worker_app = None
+
+
+class ClientVersion(namedtuple('ClientVersion', 'updated_at count max_id last_created archived today')):
+    """Datenstand eines Klienten (siehe client_version)."""
+
+    @property
+    def etag_parts(self):
+        return tuple(self)
+
+    @property
+    def last_modified(self):
+        return max(filter(None, (self.updated_at, self.last_created)), default=None)
+
+
+def client_version(client_id):
+    """
+    Datenstand eines Klienten in einer einzigen Abfrage.
+
+    Client.updated_at, Anzahl, neueste ID und jüngstes created_at der
+    Pflegeeinträge (Index ix_care_entries_client_recorded) sowie der
+    Archivstand. Dient als Cache-Schlüssel für PDF-Berichte und als Validator
+    für bedingte GET-Requests (app/http_cache.py); Alter und Dateiname hängen
+    vom Datum ab, daher gehört auch das heutige Datum dazu.
+
+    Returns:
+        ClientVersion oder None, wenn es den Klienten nicht gibt
+    """
+    entries = db.session.query(
+        func.count(CareEntry.id).label('count'),
+        func.max(CareEntry.id).label('max_id'),
+        func.max(CareEntry.created_at).label('last_created')
+    ).filter(CareEntry.client_id == client_id).subquery()
+    archives = db.session.query(
+        func.coalesce(func.sum(EntryArchive.entry_count), 0).label('count'),
+        func.max(EntryArchive.id).label('max_id')
+    ).filter(EntryArchive.client_id == client_id).subquery()
+    # Aggregate ohne GROUP BY liefern genau eine Zeile - Cross Join genügt
+    row = db.session.query(
+        Client.updated_at, entries.c.count, entries.c.max_id, entries.c.last_created,
+        archives.c.count, archives.c.max_id
+    ).select_from(Client).join(entries, true()).join(archives, true()).filter(Client.id == client_id).first()
+    if row is None:
+        return None
+    updated_at, count, max_id, last_created, archived_count_, archived_max = row
+    return ClientVersion(updated_at, count, max_id, last_created,
+                         (archived_count_, archived_max), date.today())
+
+
+def report_fingerprint(client):
+    """Liefert (updated_at, Anzahl, neueste ID, Archivstand, Datum) der Daten eines Klienten."""
+    version = client_version(client.id)
+    return client.updated_at, version.count, version.max_id, version.archived, version.today
+
+
+def _report_scope(client_id, date_from, date_to):
+    """Gemeinsamer Anfang aller Job-IDs eines Klienten und Zeitraums."""
+    scope = hashlib.sha256(f'{date_from}:{date_to}'.encode()).hexdigest()[:SCOPE_LENGTH]
+    return f'{client_id}-{scope}'
+
+
+def report_job_id(client, date_from=None, date_to=None):
+    """
+    Inhaltsbasierter Schlüssel für den Bericht eines Klienten.
+
+    Aufbau: <Klienten-ID>-<Hash des Zeitraums><Hash des Datenstands>. Neuere
+    Versionen desselben Zeitraums haben denselben Anfang (siehe store_report).
+    """
+    updated_at, count, max_id, archived, today = report_fingerprint(client)
+    raw = f'{client.id}:{updated_at}:{count}:{max_id}:{archived}:{today}:{date_from}:{date_to}'
+    content = hashlib.sha256(raw.encode()).hexdigest()[:64 - SCOPE_LENGTH]
+    return _report_scope(client.id, date_from, date_to) + content
+
+
+def _cache_dir():
+    path = current_app.config['EXPORT_CACHE_DIR']
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def report_path(job_id):
+    return os.path.join(_cache_dir(), f'{job_id}.pdf')
+
+
+def _marker_path(job_id, kind):
+    return os.path.join(_cache_dir(), f'{job_id}.{kind}')
+
+
+def job_status(job_id):
+    """
+    Status eines Export-Jobs.
+
+    Returns:
+        'done', 'pending', 'failed' oder None (unbekannt)
+    """
+    if os.path.exists(report_path(job_id)):
+        return 'done'
+    if os.path.exists(_marker_path(job_id, 'failed')):
+        return 'failed'
+    pending = _marker_path(job_id, 'pending')
+    if os.path.exists(pending):
+        # Abgestürzte Jobs nicht ewig als "läuft" melden
+        if time.time() - os.path.getmtime(pending) > current_app.config['EXPORT_JOB_TIMEOUT']:
+            return 'failed'
+        return 'pending'
+    return None
+
+
+def render_report(client, output, date_from=None, date_to=None):
+    """
+    Rendert den Bericht eines Klienten in ein Dateiobjekt.
+
+    Die Einträge werden per Server-Side-Cursor blockweise gelesen; reicht der
+    Zeitraum in archivierte Monate zurück, werden diese nach Datum eingemischt.
+    """
+    from app.pdf_generator import generate_client_report
+
+    query = client.entries.order_by(CareEntry.recorded_at.desc(), CareEntry.id.desc())
+    if date_from:
+        query = query.filter(CareEntry.recorded_at >= date_from)
+    if date_to:
+        query = query.filter(CareEntry.recorded_at < date_to)
+    if current_app.config['PDF_EXPORT_STREAMING']:
+        entries = query.yield_per(current_app.config['PDF_EXPORT_CHUNK_SIZE'])
+    else:
+        entries = query.all()
+    archived = archived_entries(client.id,
+                                newer_than=(date_from, 0) if date_from else None,
+                                older_than=(date_to, 0) if date_to else None)
+    entries = merge(entries, archived, key=entry_key, reverse=True)
+    entry_count = query.count() + archived_count(client.id, date_from, date_to)
+
+    started = time.perf_counter()
+    result = generate_client_report(client, entries, output=output, entry_count=entry_count)
+    size = result.seek(0, os.SEEK_END) if result.seekable() else None
+    result.seek(0)
+    observe_report(time.perf_counter() - started, size)
+    return result
+
+
+def store_report(client, job_id, date_from=None, date_to=None):
+    """
+    Rendert den Bericht und legt ihn atomar im Cache ab.
+
+    Ältere PDFs desselben Klienten und Zeitraums werden dabei entfernt; Berichte
+    anderer Zeiträume und Job-Marker laufender Jobs bleiben unberührt.
+
+    Returns:
+        str: Pfad der PDF-Datei
+    """
+    path = report_path(job_id)
+    fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=_cache_dir())
+    try:
+        with os.fdopen(fd, 'wb') as output:
+            render_report(client, output, date_from=date_from, date_to=date_to)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+    scope = _report_scope(client.id, date_from, date_to)
+    for old in glob.glob(os.path.join(_cache_dir(), f'{scope}*.pdf')):
+        if old != path:
+            try:
+                os.unlink(old)
+            except FileNotFoundError:
+                pass
+    return path
+
+
+def discard_reports(client_id):
+    """Entfernt alle gecachten Berichte und Job-Marker eines Klienten."""
+    for path in glob.glob(os.path.join(_cache_dir(), f'{client_id}-*')):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+def _init_worker(config_name):
+    """Initialisiert die App einmal pro Pool-Prozess."""
+    global _worker_app
+    _worker_app = create_app(config_name)
+
+
+def _run_job(client_id, job_id):
+    """Läuft im Pool-Prozess: rendert den Bericht oder hinterlegt den Fehler."""
+    with _worker_app.app_context():
+        try:
+            with replica_reads():
+                client = db.session.get(Client, client_id)
+                if client is None:
+                    raise LookupError(f'Klient {client_id} existiert nicht mehr')
+                # Hängt das Replica hinter dem Stand des Jobs, von der Primärdatenbank rendern
+                if report_job_id(client) != job_id:
+                    db.session.expunge(client)
+                    with primary_reads():
+                        client = db.session.get(Client, client_id)
+                        store_report(client, job_id)
+                else:
+                    store_report(client, job_id)
+        except Exception as exc:
+            with open(_marker_path(job_id, 'failed'), 'w') as f:
+                f.write(repr(exc))
+            raise
+        finally:
+            try:
+                os.unlink(_marker_path(job_id, 'pending'))
+            except FileNotFoundError:
+                pass
+            db.session.remove()
+
+
+def worker_app():
+    """Die App des aktuellen Pool-Prozesses (für Jobs anderer Module)."""
+    return _worker_app
+
+
+def get_executor():
+    """Prozess-Pool für Exporte (lazy, einmal pro gunicorn-Worker)."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=current_app.config['EXPORT_WORKERS'],
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(current_app.config['CONFIG_NAME'],)
+        )
+    return _executor
+
+
+def enqueue_report(client):
+    """
+    Stellt den Export eines Klientenberichts in die Warteschlange.
+
+    Ist der Bericht bereits im Cache oder in Arbeit, wird nichts gerendert.
+
+    Returns:
+        tuple: (job_id, status)
+    """
+    job_id = report_job_id(client)
+    status = job_status(job_id)
+    if status in ('done', 'pending'):
+        return job_id, status
+
+    try:
+        os.unlink(_marker_path(job_id, 'failed'))
+    except FileNotFoundError:
+        pass
+    with open(_marker_path(job_id, 'pending'), 'w'):
+        pass
+    get_executor().submit(_run_job, client.id, job_id)
+    return job_id, 'pending'
+
+
+def _render_bulk_item(client_id, date_from, date_to):
+    """
+    Läuft im Pool-Prozess: rendert einen Bericht für den Sammelexport.
+
+    Ohne Zeitraum wird der normale Cache verwendet, sonst eine Temp-Datei.
+
+    Returns:
+        tuple: (client_id, Name, Pfad, Temp-Datei?, Fehlermeldung)
+    """
+    with _worker_app.app_context(), replica_reads():
+        try:
+            client = db.session.get(Client, client_id)
+            if client is None:
+                raise LookupError(f'Klient {client_id} existiert nicht mehr')
+            if date_from is None and date_to is None:
+                job_id = report_job_id(client)
+                path = report_path(job_id)
+                if job_status(job_id) != 'done':
+                    store_report(client, job_id)
+                return client_id, client.name, path, False, None
+
+            fd, path = tempfile.mkstemp(suffix='.tmp', dir=_cache_dir())
+            with os.fdopen(fd, 'wb') as output:
+                render_report(client, output, date_from=date_from, date_to=date_to)
+            return client_id, client.name, path, True, None
+        except Exception as exc:
+            return client_id, None, None, False, repr(exc)
+        finally:
+            db.session.remove()
+
+
+class ZipStream:
+    """Nicht-seekbares Schreibziel für zipfile, das blockweise geleert wird."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_bulk_zip(client_ids, date_from=None, date_to=None):
+    """
+    Rendert die Berichte mehrerer Klienten parallel und liefert ein ZIP-Archiv
+    als Folge von Byte-Blöcken.
+
+    Es sind höchstens 2 * EXPORT_WORKERS Berichte gleichzeitig in Arbeit, jeder
+    liegt als Datei auf der Platte - der Speicherbedarf hängt also nicht von
+    der Anzahl der Klienten ab.
+    """
+    executor = get_executor()
+    max_in_flight = 2 * current_app.config['EXPORT_WORKERS']
+    pending_ids = iter(client_ids)
+    in_flight = set()
+
+    def fill():
+        for client_id in pending_ids:
+            in_flight.add(executor.submit(_render_bulk_item, client_id, date_from, date_to))
+            if len(in_flight) >= max_in_flight:
+                break
+
+    stream = ZipStream()
+    try:
+        with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            yield from _write_bulk_zip(archive, stream, in_flight, fill)
+        yield stream.drain()
+    finally:
+        # Bei Abbruch des Downloads laufende Berichte nachträglich aufräumen
+        for future in in_flight:
+            future.add_done_callback(_discard_temp_report)
+
+
+def _discard_temp_report(future):
+    _, _, path, is_temp, _ = future.result()
+    if is_temp:
+        os.unlink(path)
+
+
+def _write_bulk_zip(archive, stream, in_flight, fill):
+    fill()
+    while in_flight:
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            client_id, name, path, is_temp, error = future.result()
+            in_flight.discard(future)
+            if error:
+                archive.writestr(f'FEHLER_Klient_{client_id}.txt', error)
+                yield stream.drain()
+                continue
+
+            arcname = f"Pflegebericht_{name.replace(' ', '_')}_{client_id}.pdf"
+            try:
+                with open(path, 'rb') as source, archive.open(arcname, 'w') as target:
+                    for block in iter(lambda: source.read(64 * 1024), b''):
+                        target.write(block)
+                        yield stream.drain()
+            finally:
+                if is_temp:
+                    os.unlink(path)
+        fill()
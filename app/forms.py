@@ -1,6 +1,7 @@
 from flask_wtf import FlaskForm
-from wtforms import StringField, TextAreaField, DateField, SelectField, IntegerField, PasswordField, BooleanField
-from wtforms.validators import DataRequired, Optional, NumberRange, Length, Email, EqualTo
+from wtforms import StringField, TextAreaField, DateField, SelectField, SelectMultipleField, IntegerField, PasswordField, BooleanField
+from wtforms.validators import DataRequired, Optional, NumberRange, Length, Email, EqualTo, ValidationError
+from app.models import CareEntry
 
 
 class ClientForm(FlaskForm):
@@ -71,3 +72,45 @@ class RegisterForm(FlaskForm):
         DataRequired(message='Bitte bestätigen Sie Ihr Passwort'),
         EqualTo('password', message='Passwörter stimmen nicht überein')
     ])
+
+
+class BulkExportForm(FlaskForm):
+    clients = SelectMultipleField('Klienten', coerce=int, validators=[Optional()])
+    date_from = DateField('Von', validators=[Optional()])
+    date_to = DateField('Bis', validators=[Optional()])
+
+    def validate_date_to(self, field):
+        if field.data and self.date_from.data and field.data < self.date_from.data:
+            raise ValidationError('Das Enddatum muss nach dem Startdatum liegen')
+
+
+class EntryExportForm(FlaskForm):
+    date_from = DateField('Von', validators=[Optional()])
+    date_to = DateField('Bis', validators=[Optional()])
+    category = SelectField('Kategorie', choices=[('', '-- Alle Kategorien --')] + CareEntry.CATEGORIES,
+                           validators=[Optional()])
+    recorded_by = StringField('Erfasst von', validators=[Optional(), Length(max=100)])
+    format = SelectField('Format', choices=[
+        ('csv', 'CSV (Semikolon, UTF-8)'),
+        ('xlsx', 'Excel (XLSX)'),
+    ], default='csv')
+
+    def validate_date_to(self, field):
+        if field.data and self.date_from.data and field.data < self.date_from.data:
+            raise ValidationError('Das Enddatum muss nach dem Startdatum liegen')
+
+
+class EntrySearchForm(FlaskForm):
+    class Meta:
+        csrf = False  # GET-Formular
+
+    q = StringField('Suchbegriff', validators=[
+        DataRequired(message='Bitte einen Suchbegriff eingeben'),
+        Length(max=200)
+    ])
+    client_id = SelectField('Klient', coerce=lambda value: int(value) if value else None,
+                            validators=[Optional()])
+    category = SelectField('Kategorie', choices=[('', '-- Alle Kategorien --')] + CareEntry.CATEGORIES,
+                           validators=[Optional()])
+    date_from = DateField('Von', validators=[Optional()])
+    date_to = DateField('Bis', validators=[Optional()])
@@ -0,0 +1,222 @@
+"""
+Fragment-Cache für Templates.
+
+Der Tag {% cache %} speichert das gerenderte HTML eines Template-Ausschnitts,
+z.B. einer Zeile der Klientenliste:
+
+    {% cache 'client-row', client.id, client.updated_at %}
+        <tr>...</tr>
+    {% endcache %}
+
+Das erste Argument benennt das Fragment (für die Metrik
+mid_fragment_cache_total), die übrigen bilden zusammen mit dem Quelltext
+des Templates den Schlüssel. Ändert sich ein Klient, ändert sich updated_at
+und damit der Schlüssel - nur diese Zeile wird neu gerendert, ein explizites
+Invalidieren ist nicht nötig. Zusätzlich gehört das heutige Datum zum
+Schlüssel, damit z.B. das Alter eines Klienten am Geburtstag stimmt.
+
+Backends (FRAGMENT_CACHE_BACKEND):
+
+- 'memory': LRU-Liste pro Worker (FRAGMENT_CACHE_SIZE Einträge),
+- 'filesystem': Dateien unter FRAGMENT_CACHE_DIR, von allen gunicorn-Workern
+  gemeinsam genutzt,
+- 'redis': FRAGMENT_CACHE_REDIS_URL, benötigt das Paket redis,
+- 'none': Cache aus, die Fragmente werden immer gerendert.
+"""
+import hashlib
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from flask import current_app, has_app_context
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+from app.metrics import observe_fragment
+
+# Anteil der Schreibzugriffe, nach denen das Dateisystem-Backend aufräumt
+PRUNE_PROBABILITY = 0.01
+
+
+class MemoryBackend:
+    """LRU-Cache im Prozess."""
+
+    def __init__(self, max_entries, timeout):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._items = OrderedDict()  # Schlüssel -> (gültig bis, HTML)
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            if item[0] < time.time():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return item[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._items[key] = (time.time() + self.timeout, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+class FileSystemBackend:
+    """Eine Datei pro Fragment; gültig, solange die Datei jünger als timeout ist."""
+
+    def __init__(self, directory, timeout):
+        self.directory = directory
+        self.timeout = timeout
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            if os.path.getmtime(path) + self.timeout < time.time():
+                return None
+            with open(path, encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def set(self, key, value):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Atomar ersetzen: andere Worker lesen nie eine halbe Datei
+        fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(value)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        if random.random() < PRUNE_PROBABILITY:
+            self.prune()
+
+    def prune(self):
+        """Löscht abgelaufene Fragmente."""
+        limit = time.time() - self.timeout
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if os.path.getmtime(path) < limit:
+                        os.unlink(path)
+                except FileNotFoundError:
+                    pass
+
+    def clear(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                try:
+                    os.unlink(os.path.join(root, name))
+                except FileNotFoundError:
+                    pass
+
+
+class RedisBackend:
+    """
+    Fragmente in Redis (SETEX, läuft nach timeout Sekunden ab).
+
+    Statt einer URL kann ein fertiger Client übergeben werden - alles mit
+    get(), setex() und delete() genügt, z.B. fakeredis für lokale Tests.
+    """
+
+    def __init__(self, url=None, timeout=3600, client=None, prefix='mid:fragment:'):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.timeout = timeout
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        if isinstance(value, bytes):
+            value = value.decode('utf-8')
+        return value
+
+    def set(self, key, value):
+        self.client.setex(self.prefix + key, self.timeout, value.encode('utf-8'))
+
+    def clear(self):
+        keys = list(self.client.scan_iter(self.prefix + '*'))
+        if keys:
+            self.client.delete(*keys)
+
+
+def create_backend(config):
+    """Erzeugt das in FRAGMENT_CACHE_BACKEND konfigurierte Backend (oder None)."""
+    kind = config['FRAGMENT_CACHE_BACKEND']
+    timeout = config['FRAGMENT_CACHE_TIMEOUT']
+    if kind == 'memory':
+        return MemoryBackend(config['FRAGMENT_CACHE_SIZE'], timeout)
+    if kind == 'filesystem':
+        return FileSystemBackend(config['FRAGMENT_CACHE_DIR'], timeout)
+    if kind == 'redis':
+        return RedisBackend(config['FRAGMENT_CACHE_REDIS_URL'], timeout)
+    if kind == 'none':
+        return None
+    raise ValueError(f'Unbekanntes FRAGMENT_CACHE_BACKEND: {kind}')
+
+
+def _backend():
+    if has_app_context():
+        return current_app.extensions.get('fragment_cache')
+    return None
+
+
+class FragmentCacheExtension(Extension):
+    """Jinja-Erweiterung für {% cache name, key... %} ... {% endcache %}."""
+
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            args.append(parser.parse_expression())
+        body = parser.parse_statements(['name:endcache'], drop_needle=True)
+
+        # Geänderte Templates dürfen keine alten Fragmente ausliefern
+        version = f'{parser.name}:{lineno}'
+        if parser.name and self.environment.loader is not None:
+            source = self.environment.loader.get_source(self.environment, parser.name)[0]
+            version += ':' + hashlib.sha1(source.encode('utf-8')).hexdigest()
+
+        call = self.call_method('_render', [nodes.Const(version), nodes.List(args)])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render(self, version, parts, caller):
+        backend = _backend()
+        if backend is None:
+            return caller()
+
+        raw = repr((version, date.today(), parts))
+        key = hashlib.sha1(raw.encode('utf-8')).hexdigest()
+        value = backend.get(key)
+        observe_fragment(str(parts[0]), value is not None)
+        if value is None:
+            value = str(caller())
+            backend.set(key, value)
+        return Markup(value)
+
+
+def init_app(app):
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    app.extensions['fragment_cache'] = create_backend(app.config)
@@ -0,0 +1,127 @@
+"""
+Volltextsuche in Pflegeeinträgen.
+
+Auf PostgreSQL hat care_entries eine generierte Spalte search_vector
+(to_tsvector('german', description)) mit GIN-Index, die bei jedem INSERT und
+UPDATE automatisch gepflegt wird. Die Suche ist damit ein Index-Lookup; Rang
+und Textauszug (ts_headline) werden nur für die besten Treffer berechnet.
+
+Auf SQLite (Tests, lokale Entwicklung) wird ersatzweise per LIKE gesucht.
+"""
+import re
+from collections import namedtuple
+from markupsafe import Markup, escape
+from sqlalchemy import func, literal_column, and_
+from app import db
+from app.models import Client, CareEntry
+
+# Marker für Treffer im Textauszug; werden nach dem Escapen durch <mark> ersetzt
+START_SEL = '⟦'
+STOP_SEL = '⟧'
+HEADLINE_OPTIONS = f'StartSel={START_SEL}, StopSel={STOP_SEL}, MaxWords=35, MinWords=15, MaxFragments=2'
+
+SNIPPET_RADIUS = 80
+
+
+class EntrySearchRow(namedtuple('EntrySearchRow', [
+    'id', 'client_id', 'client_name', 'category', 'recorded_by',
+    'recorded_at', 'rank', 'raw_snippet'
+])):
+    """Ein Suchtreffer mit Rang und hervorgehobenem Textauszug."""
+
+    @property
+    def category_display(self):
+        return CareEntry.category_label(self.category)
+
+    @property
+    def snippet(self):
+        html = str(escape(self.raw_snippet))
+        return Markup(html.replace(START_SEL, '<mark>').replace(STOP_SEL, '</mark>'))
+
+
+def _filters(client_id, category, date_from, date_to):
+    conditions = []
+    if client_id:
+        conditions.append(CareEntry.client_id == client_id)
+    if category:
+        conditions.append(CareEntry.category == category)
+    if date_from:
+        conditions.append(CareEntry.recorded_at >= date_from)
+    if date_to:
+        conditions.append(CareEntry.recorded_at < date_to)
+    return conditions
+
+
+def search_entries(text, client_id=None, category=None, date_from=None, date_to=None, limit=50):
+    """
+    Durchsucht die Beschreibungen der Pflegeeinträge.
+
+    Args:
+        text: Suchbegriff(e), z.B. 'Druckstelle' oder '"Arzt informiert"'
+        client_id, category: optionale Filter
+        date_from, date_to: optionaler Zeitraum (datetime, date_to exklusiv)
+        limit: Maximale Anzahl Treffer
+
+    Returns:
+        Liste von EntrySearchRow, bester Treffer zuerst
+    """
+    text = (text or '').strip()
+    if not text:
+        return []
+    conditions = _filters(client_id, category, date_from, date_to)
+    if db.session.get_bind().dialect.name == 'postgresql':
+        return _search_postgresql(text, conditions, limit)
+    return _search_like(text, conditions, limit)
+
+
+def _search_postgresql(text, conditions, limit):
+    tsquery = func.websearch_to_tsquery('german', text)
+    vector = literal_column('care_entries.search_vector')
+    rank = func.ts_rank_cd(vector, tsquery).label('rank')
+
+    # Erst über den GIN-Index die besten Treffer bestimmen ...
+    ranked = db.session.query(CareEntry.id.label('id'), rank).filter(
+        vector.op('@@')(tsquery), *conditions
+    ).order_by(rank.desc(), CareEntry.recorded_at.desc()).limit(limit).subquery()
+
+    # ... und nur für diese den (teuren) Textauszug berechnen
+    query = db.session.query(
+        CareEntry.id, CareEntry.client_id, Client.name, CareEntry.category,
+        CareEntry.recorded_by, CareEntry.recorded_at, ranked.c.rank,
+        func.ts_headline('german', CareEntry.description, tsquery, HEADLINE_OPTIONS)
+    ).join(ranked, ranked.c.id == CareEntry.id).join(
+        Client, CareEntry.client_id == Client.id
+    ).order_by(ranked.c.rank.desc(), CareEntry.recorded_at.desc())
+    return [EntrySearchRow(*row) for row in query]
+
+
+def _snippet(description, words):
+    """Textauszug um den ersten Treffer, Suchwörter markiert."""
+    lower = description.lower()
+    first = min((lower.find(word) for word in words if word in lower), default=0)
+    start = max(first - SNIPPET_RADIUS, 0)
+    end = first + SNIPPET_RADIUS
+    excerpt = description[start:end]
+    pattern = re.compile('|'.join(re.escape(word) for word in words), re.IGNORECASE)
+    excerpt = pattern.sub(lambda m: f'{START_SEL}{m.group(0)}{STOP_SEL}', excerpt)
+    return ('...' if start else '') + excerpt + ('...' if end < len(description) else '')
+
+
+def _search_like(text, conditions, limit):
+    words = [word.lower() for word in re.findall(r'\w+', text)]
+    if not words:
+        return []
+    like = [CareEntry.description.ilike(f'%{word}%') for word in words]
+    query = db.session.query(
+        CareEntry.id, CareEntry.client_id, Client.name, CareEntry.category,
+        CareEntry.recorded_by, CareEntry.recorded_at, CareEntry.description
+    ).join(Client, CareEntry.client_id == Client.id).filter(
+        and_(*like), *conditions
+    ).order_by(CareEntry.recorded_at.desc()).limit(limit)
+
+    results = []
+    for *columns, description in query:
+        rank = sum(description.lower().count(word) for word in words)
+        results.append(EntrySearchRow(*columns, rank, _snippet(description, words)))
+    results.sort(key=lambda row: row.rank, reverse=True)
+    return results
@@ -0,0 +1,83 @@
+"""
+Bedingte GET-Requests (ETag / Last-Modified).
+
+@conditional(version_for) berechnet vor der View einen Datenstand - z.B.
+exports.client_version(): Client.updated_at plus Anzahl und neueste ID der
+Pflegeeinträge, eine Abfrage. Schickt der Browser denselben Stand per
+If-None-Match (oder If-Modified-Since) mit, antwortet die App sofort mit
+304 Not Modified; Template bzw. PDF werden gar nicht erst erzeugt.
+
+Das ETag enthält außerdem Benutzer und Rolle (Navigation, Admin-Buttons)
+sowie den Stand der Templates, damit ein Deployment nicht aus dem Cache
+bedient wird. Seiten mit ausstehenden Flash-Meldungen werden weder mit 304
+beantwortet noch mit einem ETag versehen.
+"""
+import hashlib
+import os
+from functools import wraps
+from flask import current_app, make_response, request, session
+from flask_login import current_user
+from werkzeug.http import is_resource_modified
+
+_template_version = None
+
+
+def _templates_changed_at():
+    """Jüngste Änderung an einem Template (einmal pro Prozess ermittelt)."""
+    global _template_version
+    if _template_version is None:
+        latest = 0
+        for root, _, files in os.walk(os.path.join(current_app.root_path, 'templates')):
+            for name in files:
+                latest = max(latest, os.path.getmtime(os.path.join(root, name)))
+        _template_version = int(latest)
+    return _template_version
+
+
+def _etag(version):
+    raw = ':'.join(str(part) for part in (
+        *version.etag_parts, current_user.get_id(), current_user.role, current_user.name,
+        _templates_changed_at()
+    ))
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def conditional(version_for, arg='id'):
+    """
+    Decorator: beantwortet unveränderte GET-Requests mit 304.
+
+    Args:
+        version_for: Funktion, die mit dem URL-Parameter arg aufgerufen wird
+            und ein Objekt mit etag_parts und last_modified liefert - oder
+            None, wenn es die Ressource nicht gibt (die View antwortet dann
+            selbst, z.B. mit 404).
+        arg: Name des URL-Parameters mit der ID
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or session.get('_flashes'):
+                return view(*args, **kwargs)
+            version = version_for(kwargs[arg])
+            if version is None:
+                return view(*args, **kwargs)
+
+            etag = _etag(version)
+            if not is_resource_modified(request.environ, etag=etag,
+                                        last_modified=version.last_modified):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                # Die View kann selbst eine Meldung erzeugt haben
+                if response.status_code != 200 or session.get('_flashes'):
+                    return response
+
+            response.set_etag(etag)
+            if version.last_modified is not None:
+                response.last_modified = version.last_modified
+            # Browser darf speichern, muss aber jedes Mal nachfragen
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
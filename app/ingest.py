@@ -0,0 +1,160 @@
+"""
+Sammel-Import von Pflegeeinträgen (Schichtübergabe von Tablets).
+
+Ein Batch kommt als JSON oder CSV, wird Zeile für Zeile mit denselben Regeln
+wie CareEntryForm geprüft und anschließend mit einem einzigen
+executemany-INSERT in einer Transaktion gespeichert.
+"""
+import csv
+import io
+from datetime import datetime, timezone
+from sqlalchemy import insert
+from werkzeug.datastructures import MultiDict
+from app import db
+from app.models import Client, CareEntry
+from app.forms import CareEntryForm
+from app.activity import record_inserts
+
+FIELDS = ('client_id', 'category', 'description', 'recorded_by', 'recorded_at')
+
+
+class IngestError(ValueError):
+    """Der Batch als Ganzes ist unbrauchbar (Format, Größe)."""
+
+
+def parse_batch(request):
+    """
+    Liest die Zeilen eines Batches aus dem Request.
+
+    Akzeptiert JSON (Liste oder {"entries": [...]}), CSV als Request-Body
+    (text/csv) oder CSV als Datei-Upload im Feld "file".
+
+    Returns:
+        Liste von dicts
+    """
+    if request.is_json:
+        payload = request.get_json(silent=True)
+        if isinstance(payload, dict):
+            payload = payload.get('entries')
+        if not isinstance(payload, list) or not all(isinstance(row, dict) for row in payload):
+            raise IngestError('JSON muss eine Liste von Einträgen oder {"entries": [...]} sein.')
+        return payload
+
+    if 'file' in request.files:
+        raw = request.files['file'].read()
+    elif request.mimetype == 'text/csv':
+        raw = request.get_data()
+    else:
+        raise IngestError('Erwartet JSON oder CSV (text/csv bzw. Datei-Upload "file").')
+
+    try:
+        text = raw.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        raise IngestError('CSV muss UTF-8-kodiert sein.')
+    return list(csv.DictReader(io.StringIO(text)))
+
+
+def _parse_recorded_at(value):
+    """ISO 8601; Angaben mit Zeitzone werden wie utcnow() als naive UTC-Zeit gespeichert."""
+    if not value:
+        return None
+    recorded_at = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if recorded_at.tzinfo is not None:
+        recorded_at = recorded_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return recorded_at
+
+
+def _parse_client_id(value):
+    """Nur ganze Zahlen oder Ziffernfolgen - kein true, 1.9 o.ä. (sonst None)."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.strip().isascii() and value.strip().isdigit():
+        return int(value.strip())
+    return None
+
+
+def validate_row(row, known_client_ids, default_recorded_by):
+    """
+    Prüft eine Zeile wie CareEntryForm.
+
+    Returns:
+        tuple: (Werte für den INSERT oder None, Fehler-dict)
+    """
+    data = {field: row.get(field) for field in FIELDS}
+    if not data['recorded_by']:
+        data['recorded_by'] = default_recorded_by
+
+    form = CareEntryForm(
+        formdata=MultiDict({key: str(value) for key, value in data.items() if value is not None}),
+        meta={'csrf': False}
+    )
+    form.validate()
+    errors = {field: list(messages) for field, messages in form.errors.items()}
+
+    client_id = _parse_client_id(data['client_id'])
+    if client_id not in known_client_ids:
+        errors['client_id'] = ['Unbekannter Klient']
+
+    try:
+        recorded_at = _parse_recorded_at(data['recorded_at'])
+    except ValueError:
+        errors['recorded_at'] = ['Ungültiger Zeitpunkt (ISO 8601 erwartet)']
+        recorded_at = None
+
+    if errors:
+        return None, errors
+
+    values = {
+        'client_id': client_id,
+        'category': form.category.data,
+        'description': form.description.data,
+        'recorded_by': form.recorded_by.data,
+    }
+    if recorded_at is not None:
+        values['recorded_at'] = recorded_at
+    return values, {}
+
+
+def ingest_batch(rows, default_recorded_by, atomic=False):
+    """
+    Prüft und speichert einen Batch von Pflegeeinträgen.
+
+    Args:
+        rows: Liste von dicts (siehe FIELDS)
+        default_recorded_by: Mitarbeiter, falls recorded_by fehlt
+        atomic: Bei einem Fehler gar nichts speichern
+
+    Returns:
+        Liste der Ergebnisse pro Zeile (in Eingabereihenfolge)
+    """
+    requested_ids = {_parse_client_id(row.get('client_id')) for row in rows} - {None}
+    known_client_ids = {
+        client_id for client_id, in
+        db.session.query(Client.id).filter(Client.id.in_(requested_ids))
+    } if requested_ids else set()
+
+    results = []
+    valid = []
+    for number, row in enumerate(rows, start=1):
+        values, errors = validate_row(row, known_client_ids, default_recorded_by)
+        if errors:
+            results.append({'row': number, 'status': 'error', 'errors': errors})
+        else:
+            results.append({'row': number, 'status': 'created'})
+            valid.append((results[-1], values))
+
+    if not valid or (atomic and len(valid) != len(rows)):
+        for result, _ in valid:
+            result['status'] = 'skipped'
+        return results
+
+    # Spalten vereinheitlichen, damit alle Zeilen in ein executemany passen
+    now = datetime.utcnow()
+    rows = [{'recorded_at': now, **values} for _, values in valid]
+    db.session.execute(insert(CareEntry), rows)
+    # Core-INSERT löst keine ORM-Events aus
+    record_inserts(rows)
+    db.session.commit()
+    return results
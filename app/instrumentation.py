@@ -0,0 +1,143 @@
+"""
+SQL-Instrumentierung pro Request.
+
+Hängt sich an die SQLAlchemy-Events before_cursor_execute und
+after_cursor_execute und sammelt für jeden Flask-Request:
+
+- Anzahl der SQL-Statements und gesamte Datenbankzeit,
+- wie oft dieselbe Statement-Form (Literale und IN-Listen normalisiert)
+  ausgeführt wurde. Wiederholt sich eine Form mindestens
+  SQL_NPLUS1_THRESHOLD-mal, ist das meist ein N+1-Muster, z.B. ein
+  Lazy Load von entry.client pro Zeile einer Liste.
+
+Die Werte gehen als Server-Timing-Header an den Browser (sichtbar in den
+DevTools) und, wenn SQL_SLOW_REQUEST_MS, SQL_MAX_QUERIES oder die
+N+1-Schwelle überschritten sind, als Warnung ins Log.
+"""
+import re
+import time
+from collections import Counter
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_listening = False
+
+_WHITESPACE = re.compile(r'\s+')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*(?:\?|%\(\w+\)s|:\w+|\$\d+)\s*,?)+\)', re.IGNORECASE)
+
+
+def statement_shape(statement):
+    """Normalisiert ein Statement, damit gleiche Abfragen gleich aussehen."""
+    shape = _STRING.sub('?', statement)
+    shape = _NUMBER.sub('?', shape)
+    shape = _IN_LIST.sub('IN (...)', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+
+class RequestSqlStats:
+    """SQL-Kennzahlen eines Requests."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement, duration, executemany):
+        self.count += 1
+        self.duration += duration
+        # executemany ist ein einziger Roundtrip, kein N+1
+        if not executemany:
+            self.shapes[statement_shape(statement)] += 1
+
+    @property
+    def duration_ms(self):
+        return self.duration * 1000
+
+    @property
+    def total_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def repeated(self, threshold):
+        """Statement-Formen, die mindestens threshold-mal ausgeführt wurden."""
+        return [(shape, count) for shape, count in self.shapes.most_common()
+                if count >= threshold]
+
+
+def current_stats():
+    """SQL-Kennzahlen des laufenden Requests oder None."""
+    if not has_request_context():
+        return None
+    return g.get('sql_stats')
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('query_start_time')
+    if not starts:
+        return
+    duration = time.perf_counter() - starts.pop()
+    stats = current_stats()
+    if stats is not None:
+        stats.record(statement, duration, executemany)
+
+
+def _handle_error(context):
+    # Fehlgeschlagene Statements lösen kein after_cursor_execute aus
+    starts = context.connection.info.get('query_start_time') if context.connection else None
+    if starts:
+        starts.pop()
+
+
+def _start_request():
+    g.sql_stats = RequestSqlStats()
+
+
+def _finish_request(response):
+    app = current_app
+    stats = g.pop('sql_stats', None)
+    if stats is None:
+        return response
+
+    if app.config['SQL_SERVER_TIMING']:
+        response.headers.add(
+            'Server-Timing',
+            f'db;dur={stats.duration_ms:.1f};desc="{stats.count} SQL", '
+            f'app;dur={stats.total_ms:.1f}'
+        )
+
+    repeated = stats.repeated(app.config['SQL_NPLUS1_THRESHOLD'])
+    slow_ms = app.config['SQL_SLOW_REQUEST_MS']
+    max_queries = app.config['SQL_MAX_QUERIES']
+    too_slow = slow_ms is not None and stats.duration_ms > slow_ms
+    too_many = max_queries is not None and stats.count > max_queries
+    if repeated or too_slow or too_many:
+        lines = [f'SQL {request.method} {request.path} ({request.endpoint}): '
+                 f'{stats.count} Statements, {stats.duration_ms:.1f} ms DB, '
+                 f'{stats.total_ms:.1f} ms gesamt']
+        for shape, count in repeated[:3]:
+            lines.append(f'  mögliches N+1 ({count}x): {shape[:200]}')
+        app.logger.warning('\n'.join(lines))
+    return response
+
+
+def init_app(app):
+    """Aktiviert die Instrumentierung, wenn SQL_INSTRUMENTATION gesetzt ist."""
+    global _listening
+    if not app.config['SQL_INSTRUMENTATION']:
+        return
+
+    if not _listening:
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+        _listening = True
+
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
@@ -0,0 +1,161 @@
+"""
+Prometheus-Metriken unter /metrics.
+
+Erfasst werden:
+
+- Latenz-Histogramm und Anzahl der Requests pro Endpoint (clients.*,
+  entries.*, main.*, auth.*), Letztere zusätzlich nach HTTP-Status,
+- der SQLAlchemy-Verbindungspool je Engine: belegte Verbindungen, Overflow,
+  Checkouts und die Wartezeit auf eine freie Verbindung,
+- Dauer und Größe der gerenderten PDF-Berichte (siehe observe_report),
+- Treffer und Fehlschläge des Fragment-Caches (siehe observe_fragment).
+
+Unter gunicorn läuft jeder Worker in einem eigenen Prozess. Ist
+PROMETHEUS_MULTIPROC_DIR gesetzt (gunicorn.conf.py erledigt das), schreibt
+prometheus_client die Werte aller Prozesse - auch die des Export-Pools - in
+dieses Verzeichnis, und /metrics fasst sie beim Abruf zusammen.
+"""
+import os
+import time
+from flask import current_app, g, request, abort, Response
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest,
+    REGISTRY
+)
+from prometheus_client import multiprocess
+from sqlalchemy import event
+
+REQUEST_LATENCY = Histogram(
+    'mid_request_duration_seconds', 'Dauer der HTTP-Requests', ['endpoint', 'method'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+REQUEST_COUNT = Counter(
+    'mid_requests_total', 'HTTP-Requests nach Status', ['endpoint', 'method', 'status']
+)
+
+POOL_CHECKED_OUT = Gauge(
+    'mid_db_pool_checked_out', 'Aktuell belegte Verbindungen', ['engine'],
+    multiprocess_mode='livesum'
+)
+POOL_OVERFLOW = Gauge(
+    'mid_db_pool_overflow', 'Verbindungen über pool_size hinaus', ['engine'],
+    multiprocess_mode='livesum'
+)
+POOL_SIZE = Gauge(
+    'mid_db_pool_size', 'Konfigurierte Poolgröße', ['engine'],
+    multiprocess_mode='livesum'
+)
+POOL_CHECKOUTS = Counter(
+    'mid_db_pool_checkouts_total', 'Checkouts aus dem Verbindungspool', ['engine']
+)
+POOL_WAIT = Histogram(
+    'mid_db_pool_wait_seconds', 'Wartezeit auf eine Verbindung aus dem Pool', ['engine'],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30)
+)
+
+REPORT_DURATION = Histogram(
+    'mid_pdf_report_duration_seconds', 'Renderdauer eines Pflegeberichts',
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+)
+REPORT_SIZE = Histogram(
+    'mid_pdf_report_bytes', 'Größe eines Pflegeberichts',
+    buckets=(10e3, 50e3, 100e3, 250e3, 500e3, 1e6, 2.5e6, 5e6, 10e6, 25e6, 50e6)
+)
+
+FRAGMENT_CACHE = Counter(
+    'mid_fragment_cache_total', 'Zugriffe auf den Fragment-Cache', ['fragment', 'result']
+)
+
+
+def observe_report(seconds, size):
+    """Erfasst Dauer und Größe eines gerenderten PDF-Berichts."""
+    REPORT_DURATION.observe(seconds)
+    if size is not None:
+        REPORT_SIZE.observe(size)
+
+
+def observe_fragment(name, hit):
+    """Zählt einen Zugriff auf den Fragment-Cache."""
+    FRAGMENT_CACHE.labels(name, 'hit' if hit else 'miss').inc()
+
+
+def _update_pool(name, pool):
+    for gauge, method in ((POOL_CHECKED_OUT, 'checkedout'), (POOL_OVERFLOW, 'overflow'),
+                          (POOL_SIZE, 'size')):
+        if hasattr(pool, method):
+            # overflow() ist negativ, solange pool_size noch nicht ausgeschöpft ist
+            gauge.labels(name).set(max(getattr(pool, method)(), 0))
+
+
+def _instrument_pool(name, pool):
+    """Misst die Wartezeit in pool.connect()."""
+    connect = pool.connect
+
+    def timed_connect():
+        started = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            POOL_WAIT.labels(name).observe(time.perf_counter() - started)
+
+    pool.connect = timed_connect
+    _update_pool(name, pool)
+
+
+def _instrument_engine(name, engine):
+    _instrument_pool(name, engine.pool)
+
+    @event.listens_for(engine, 'checkout')
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        POOL_CHECKOUTS.labels(name).inc()
+        _update_pool(name, engine.pool)
+
+    @event.listens_for(engine, 'checkin')
+    def on_checkin(dbapi_connection, connection_record):
+        _update_pool(name, engine.pool)
+
+    # dispose() ersetzt den Pool durch einen neuen
+    @event.listens_for(engine, 'engine_disposed')
+    def on_disposed(engine):
+        _instrument_pool(name, engine.pool)
+
+
+def _start_timer():
+    g.metrics_started = time.perf_counter()
+
+
+def _record_request(response):
+    started = g.pop('metrics_started', None)
+    if started is not None:
+        endpoint = request.endpoint or 'unmatched'
+        REQUEST_LATENCY.labels(endpoint, request.method).observe(time.perf_counter() - started)
+        REQUEST_COUNT.labels(endpoint, request.method, str(response.status_code)).inc()
+    return response
+
+
+def metrics_view():
+    token = current_app.config['METRICS_TOKEN']
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        abort(403)
+
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+
+def init_app(app):
+    """Registriert /metrics und die Messpunkte, wenn METRICS_ENABLED gesetzt ist."""
+    if not app.config['METRICS_ENABLED']:
+        return
+
+    from app import db
+    with app.app_context():
+        for bind_key, engine in db.engines.items():
+            _instrument_engine(bind_key or 'default', engine)
+
+    app.before_request(_start_timer)
+    app.after_request(_record_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
@@ -41,6 +41,16 @@ class User(UserMixin, db.Model):
         return f'<User {self.email}>'
 
 
+def calculate_age(birth_date):
+    """Alter in Jahren zum heutigen Datum (oder None ohne Geburtsdatum)."""
+    if birth_date:
+        today = date.today()
+        return today.year - birth_date.year - (
+            (today.month, today.day) < (birth_date.month, birth_date.day)
+        )
+    return None
+
+
 class Client(db.Model):
     __tablename__ = 'clients'
 
@@ -53,20 +63,27 @@ class Client(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # passive_deletes: Einträge nicht laden, sondern mengenbasiert löschen
+    # (app/purge.py, auf PostgreSQL zusätzlich ON DELETE CASCADE)
     entries = db.relationship('CareEntry', backref='client', lazy='dynamic',
-                              cascade='all, delete-orphan')
+                              cascade='all, delete-orphan', passive_deletes=True)
+    archives = db.relationship('EntryArchive', backref='client', lazy='dynamic',
+                               cascade='all, delete-orphan', passive_deletes=True)
+
+    # Trigramm-Indizes für die Klientensuche (nur PostgreSQL, siehe app/search.py)
+    __table_args__ = (
+        db.Index('ix_clients_name_trgm', name,
+                 postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+        db.Index('ix_clients_address_trgm', address,
+                 postgresql_using='gin', postgresql_ops={'address': 'gin_trgm_ops'}),
+    )
 
     def __repr__(self):
         return f'<Client {self.name}>'
 
     @property
     def age(self):
-        if self.birth_date:
-            today = date.today()
-            return today.year - self.birth_date.year - (
-                (today.month, today.day) < (self.birth_date.month, self.birth_date.day)
-            )
-        return None
+        return calculate_age(self.birth_date)
 
 
 class CareEntry(db.Model):
@@ -82,19 +99,73 @@ class CareEntry(db.Model):
     ]
 
     id = db.Column(db.Integer, primary_key=True)
-    client_id = db.Column(db.Integer, db.ForeignKey('clients.id'), nullable=False)
+    client_id = db.Column(db.Integer, db.ForeignKey('clients.id', ondelete='CASCADE'), nullable=False)
     category = db.Column(db.String(50), nullable=False)
     description = db.Column(db.Text, nullable=False)
     recorded_by = db.Column(db.String(100), nullable=False)
-    recorded_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Partitionsschlüssel auf PostgreSQL (siehe app/partitions.py)
+    recorded_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Passend zur Keyset-Pagination (client_id, recorded_at DESC, id DESC)
+    __table_args__ = (
+        db.Index('ix_care_entries_client_recorded',
+                 client_id, recorded_at.desc(), id.desc()),
+        db.Index('ix_care_entries_recorded_at', recorded_at),
+    )
+
     def __repr__(self):
         return f'<CareEntry {self.category} for Client {self.client_id}>'
 
     @property
     def category_display(self):
-        for code, name in self.CATEGORIES:
-            if code == self.category:
+        return self.category_label(self.category)
+
+    @classmethod
+    def category_label(cls, category):
+        for code, name in cls.CATEGORIES:
+            if code == category:
                 return name
-        return self.category
+        return category
+
+
+class ClientActivity(db.Model):
+    """Aktivität eines Klienten, inkrementell gepflegt (siehe app/activity.py)."""
+    __tablename__ = 'client_activity'
+
+    client_id = db.Column(db.Integer, db.ForeignKey('clients.id', ondelete='CASCADE'), primary_key=True)
+    entry_count = db.Column(db.Integer, nullable=False, default=0)  # inkl. Archiv
+    last_entry_at = db.Column(db.DateTime, nullable=True)
+    # {Kategorie: recorded_at des letzten Eintrags als ISO-String}
+    last_entry_by_category = db.Column(db.JSON, nullable=False, default=dict)
+
+    # Sortierung der Klientenliste nach Aktivität
+    __table_args__ = (
+        db.Index('ix_client_activity_last_entry_at', last_entry_at),
+    )
+
+    def __repr__(self):
+        return f'<ClientActivity {self.entry_count} entries for Client {self.client_id}>'
+
+
+class EntryArchive(db.Model):
+    """Manifest eines archivierten Monats (Pflegeeinträge eines Klienten, siehe app/archive.py)."""
+    __tablename__ = 'entry_archives'
+
+    id = db.Column(db.Integer, primary_key=True)
+    client_id = db.Column(db.Integer, db.ForeignKey('clients.id', ondelete='CASCADE'), nullable=False)
+    month = db.Column(db.Date, nullable=False)  # Erster Tag des Monats
+    path = db.Column(db.String(255), nullable=False)  # relativ zu ARCHIVE_DIR
+    entry_count = db.Column(db.Integer, nullable=False)
+    first_recorded_at = db.Column(db.DateTime, nullable=False)
+    last_recorded_at = db.Column(db.DateTime, nullable=False)
+    size_bytes = db.Column(db.Integer, nullable=False)
+    sha256 = db.Column(db.String(64), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('client_id', 'month', name='uq_entry_archives_client_month'),
+    )
+
+    def __repr__(self):
+        return f'<EntryArchive {self.month:%Y-%m} for Client {self.client_id}>'
@@ -0,0 +1,116 @@
+"""
+Keyset-Pagination für Pflegeeinträge.
+
+Statt OFFSET/LIMIT wird über den Cursor (recorded_at, id) geblättert. Mit dem
+Index ix_care_entries_client_recorded kostet jede Seite gleich viel - egal wie
+weit man in der Historie zurückgeht.
+
+Archivierte Monate (app/archive.py) werden nach demselben Schlüssel
+eingemischt; die Archivdateien werden nur gelesen, wenn ihr Zeitraum die
+Seite berührt.
+"""
+from datetime import datetime
+from heapq import merge
+from itertools import islice
+from sqlalchemy import tuple_
+from app.models import CareEntry
+from app.projections import entry_rows, iter_entry_rows
+from app.archive import archived_entries, entry_key
+
+CURSOR_FORMAT = '%Y%m%d%H%M%S%f'
+
+
+def encode_cursor(entry):
+    """Erzeugt den Cursor-String für einen Eintrag (z.B. '20260115143800000000_42')."""
+    return f'{entry.recorded_at.strftime(CURSOR_FORMAT)}_{entry.id}'
+
+
+def decode_cursor(value):
+    """
+    Zerlegt einen Cursor-String in (recorded_at, id).
+
+    Returns:
+        tuple oder None, wenn der Cursor fehlt oder ungültig ist
+    """
+    if not value:
+        return None
+    try:
+        timestamp, entry_id = value.split('_', 1)
+        return datetime.strptime(timestamp, CURSOR_FORMAT), int(entry_id)
+    except ValueError:
+        return None
+
+
+class KeysetPage:
+    """Eine Seite Pflegeeinträge inkl. Cursor für die Navigation."""
+
+    def __init__(self, items, has_older, has_newer):
+        self.items = items
+        self.has_older = has_older
+        self.has_newer = has_newer
+
+    @property
+    def older_cursor(self):
+        return encode_cursor(self.items[-1]) if self.has_older and self.items else None
+
+    @property
+    def newer_cursor(self):
+        return encode_cursor(self.items[0]) if self.has_newer and self.items else None
+
+
+def paginate_entries(client_id, before=None, after=None, per_page=50):
+    """
+    Lädt eine Seite Pflegeeinträge eines Klienten, neueste zuerst.
+
+    Args:
+        client_id: ID des Klienten
+        before: Cursor - liefert Einträge, die älter sind als dieser
+        after: Cursor - liefert Einträge, die neuer sind als dieser
+        per_page: Anzahl Einträge pro Seite
+
+    Returns:
+        KeysetPage mit EntryRow- bzw. ArchivedEntry-Tupeln
+    """
+    query = CareEntry.query.filter(CareEntry.client_id == client_id)
+    key = tuple_(CareEntry.recorded_at, CareEntry.id)
+
+    before = decode_cursor(before)
+    after = decode_cursor(after)
+
+    if after and not before:
+        # Rückwärts blättern: aufsteigend lesen und danach umdrehen
+        rows = entry_rows(query.filter(key > after).order_by(
+            CareEntry.recorded_at.asc(), CareEntry.id.asc()
+        ).limit(per_page + 1))
+        # Archiv nur bis zum letzten Tabellen-Eintrag der Seite lesen
+        upper = entry_key(rows[-1]) if len(rows) > per_page else None
+        archived = archived_entries(client_id, newer_than=after, older_than=upper,
+                                    newest_first=False)
+        rows = list(islice(merge(rows, archived, key=entry_key), per_page + 1))
+        has_newer = len(rows) > per_page
+        items = rows[:per_page][::-1]
+        return KeysetPage(items, has_older=True, has_newer=has_newer)
+
+    if before:
+        query = query.filter(key < before)
+    rows = entry_rows(query.order_by(
+        CareEntry.recorded_at.desc(), CareEntry.id.desc()
+    ).limit(per_page + 1))
+    lower = entry_key(rows[-1]) if len(rows) > per_page else None
+    archived = archived_entries(client_id, newer_than=lower, older_than=before)
+    rows = list(islice(merge(rows, archived, key=entry_key, reverse=True), per_page + 1))
+    has_older = len(rows) > per_page
+    return KeysetPage(rows[:per_page], has_older=has_older, has_newer=before is not None)
+
+
+def iter_all_entries(client_id, chunk_size=500):
+    """
+    Der gesamte Verlauf eines Klienten, neueste zuerst, inkl. Archiv.
+
+    Liest die Tabelle blockweise per Server-Side-Cursor; die Einträge werden
+    erst beim Iterieren geladen und nie vollständig im Speicher gehalten.
+    """
+    rows = iter_entry_rows(CareEntry.query.filter(CareEntry.client_id == client_id).order_by(
+        CareEntry.recorded_at.desc(), CareEntry.id.desc()
+    ), chunk_size)
+    return merge(rows, archived_entries(client_id), key=entry_key, reverse=True)
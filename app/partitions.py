@@ -0,0 +1,144 @@
+"""
+Monatliche Range-Partitionen für care_entries (nur PostgreSQL).
+
+Die Migration e7b4d2a9c1f6 legt care_entries als nach recorded_at
+partitionierte Tabelle an: eine Partition pro Monat (care_entries_pJJJJ_MM)
+plus care_entries_default für alles außerhalb. Abfragen mit Bedingung auf
+recorded_at - "Einträge heute" auf dem Dashboard, die neuesten Einträge -
+lesen dadurch nur die aktuelle Partition, und alte Monate lassen sich per
+DETACH PARTITION ohne DELETE aus der Tabelle lösen.
+
+Zukünftige Partitionen legt `flask partitions ensure` an (z.B. täglich per
+Cron). Fehlt eine Partition doch einmal - auch für vergangene Monate, etwa
+nach rückdatierten Importen oder `flask data generate` -, landen die Zeilen
+in der Default-Partition; ensure legt für jeden dort vorkommenden Monat die
+Partition an und zieht die Zeilen um.
+"""
+from collections import namedtuple
+from datetime import date
+from sqlalchemy import text
+from app import db
+
+PARENT = 'care_entries'
+DEFAULT_PARTITION = 'care_entries_default'
+COLUMNS = 'id, client_id, category, description, recorded_by, recorded_at, created_at'
+
+PartitionInfo = namedtuple('PartitionInfo', ['name', 'bounds', 'rows', 'size_bytes'])
+
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def add_months(day, months):
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f'{PARENT}_p{month.year:04d}_{month.month:02d}'
+
+
+def is_partitioned():
+    """True, wenn care_entries auf dieser Datenbank partitioniert ist."""
+    if db.session.get_bind().dialect.name != 'postgresql':
+        return False
+    return db.session.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+        "WHERE partrelid = to_regclass(:parent))"
+    ), {'parent': PARENT}).scalar()
+
+
+def existing_partitions():
+    return set(db.session.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:parent)"
+    ), {'parent': PARENT}).scalars())
+
+
+def create_partition(month):
+    """
+    Legt die Partition für einen Monat an.
+
+    Liegen für diesen Monat bereits Zeilen in der Default-Partition, wird sie
+    kurz abgehängt und die Zeilen werden in die neue Partition verschoben -
+    PostgreSQL lehnt die neue Partition sonst ab.
+
+    Returns:
+        Anzahl der aus der Default-Partition verschobenen Zeilen
+    """
+    name = partition_name(month)
+    bounds = {'start': month, 'end': add_months(month, 1)}
+    create = text(
+        f"CREATE TABLE {name} PARTITION OF {PARENT} "
+        f"FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"
+    )
+    in_range = 'recorded_at >= :start AND recorded_at < :end'
+
+    stray = db.session.execute(text(
+        f"SELECT count(*) FROM {DEFAULT_PARTITION} WHERE {in_range}"
+    ), bounds).scalar()
+    if not stray:
+        db.session.execute(create)
+        return 0
+
+    db.session.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {DEFAULT_PARTITION}"))
+    db.session.execute(create)
+    db.session.execute(text(
+        f"INSERT INTO {PARENT} ({COLUMNS}) SELECT {COLUMNS} FROM {DEFAULT_PARTITION} WHERE {in_range}"
+    ), bounds)
+    db.session.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}"), bounds)
+    db.session.execute(text(f"ALTER TABLE {PARENT} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+    return stray
+
+
+def stray_months():
+    """Monate, für die Zeilen in der Default-Partition liegen."""
+    return set(db.session.execute(text(
+        f"SELECT DISTINCT date_trunc('month', recorded_at)::date FROM {DEFAULT_PARTITION}"
+    )).scalars())
+
+
+def ensure_partitions(months_ahead=3, today=None):
+    """
+    Legt die Partitionen vom aktuellen Monat bis months_ahead Monate voraus an,
+    dazu die Partitionen aller Monate, deren Zeilen in der Default-Partition liegen.
+
+    Returns:
+        Liste von (Partitionsname, verschobene Zeilen) der neu angelegten Partitionen
+    """
+    current = month_start(today or date.today())
+    months = stray_months() | {add_months(current, offset) for offset in range(months_ahead + 1)}
+    existing = existing_partitions()
+    created = []
+    for month in sorted(months):
+        if partition_name(month) not in existing:
+            created.append((partition_name(month), create_partition(month)))
+    db.session.commit()
+    return created
+
+
+def detach_partition(month):
+    """
+    Löst eine Monats-Partition aus care_entries.
+
+    Die Tabelle bleibt als eigenständige Tabelle erhalten (z.B. für
+    Archivierung per pg_dump) und kann anschließend gelöscht werden.
+    """
+    name = partition_name(month_start(month))
+    if name not in existing_partitions():
+        raise LookupError(f'Partition {name} existiert nicht')
+    db.session.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+    db.session.commit()
+    return name
+
+
+def partition_report():
+    """Name, Grenzen, geschätzte Zeilenzahl und Größe aller Partitionen."""
+    rows = db.session.execute(text(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), "
+        "greatest(c.reltuples, 0)::bigint, pg_total_relation_size(c.oid) "
+        "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:parent) ORDER BY c.relname"
+    ), {'parent': PARENT})
+    return [PartitionInfo(*row) for row in rows]
@@ -1,29 +1,179 @@
 """
 PDF-Generator für Pflegeberichte
 Erstellt professionelle PDF-Dokumente für Klienten-Dokumentation.
+
+Styles, Tabellen-Styles und Flowable-Vorlagen (Trennlinie, Abstände) baut
+ReportTemplate einmal pro Prozess (report_template()). Pro Eintrag entstehen
+nur ein Paragraph und eine Kopie der Trennlinie.
 """
+from copy import copy
 from io import BytesIO
 from datetime import datetime
+from functools import lru_cache
+from xml.sax.saxutils import escape
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import cm
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, HRFlowable
+from reportlab.lib.enums import TA_CENTER
+from app.models import CareEntry
+
+BRAND_COLOR = colors.HexColor('#2E8B8B')
+
+
+class _IncrementalStory(list):
+    """
+    Story, die sich während doc.build() aus einem Iterator nachfüllt.
+
+    Platypus prüft in jeder Runde len(story); ist der Puffer leer, wird der
+    nächste Block Flowables erzeugt. So liegt nie die ganze Story im Speicher.
+    """
+
+    def __init__(self, head, chunks):
+        super().__init__(head)
+        self._chunks = chunks
+
+    def __len__(self):
+        while not super().__len__():
+            try:
+                self.extend(next(self._chunks))
+            except StopIteration:
+                break
+        return super().__len__()
+
+
+class ReportTemplate:
+    """
+    Layout eines Pflegeberichts: Styles und Vorlagen für wiederkehrende Flowables.
+
+    Flowables werden nicht geteilt, sondern kopiert - Platypus merkt sich
+    Zustand (z.B. _postponed) am Objekt.
+    """
+
+    def __init__(self):
+        styles = getSampleStyleSheet()
+        self.title = ParagraphStyle(
+            name='MIDTitle',
+            parent=styles['Heading1'],
+            fontSize=24,
+            textColor=BRAND_COLOR,
+            spaceAfter=20,
+            alignment=TA_CENTER
+        )
+        self.subtitle = ParagraphStyle(
+            name='MIDSubtitle',
+            parent=styles['Normal'],
+            fontSize=12,
+            textColor=colors.grey,
+            alignment=TA_CENTER,
+            spaceAfter=30
+        )
+        self.section_header = ParagraphStyle(
+            name='SectionHeader',
+            parent=styles['Heading2'],
+            fontSize=14,
+            textColor=BRAND_COLOR,
+            spaceBefore=20,
+            spaceAfter=10
+        )
+        self.entry_text = ParagraphStyle(
+            name='EntryText',
+            parent=styles['Normal'],
+            fontSize=10,
+            leading=14
+        )
+        self.footer = ParagraphStyle(
+            name='Footer',
+            parent=styles['Normal'],
+            fontSize=8,
+            textColor=colors.grey,
+            alignment=TA_CENTER
+        )
+        self.client_table = TableStyle([
+            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#E0F2F1')),
+            ('TEXTCOLOR', (0, 0), (0, -1), BRAND_COLOR),
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('PADDING', (0, 0), (-1, -1), 8),
+            ('GRID', (0, 0), (-1, -1), 0.5, BRAND_COLOR),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ])
+        # Trennlinie zwischen Einträgen, inkl. der Abstände davor und danach
+        self.separator = HRFlowable(width='100%', thickness=0.5, color=colors.lightgrey,
+                                    spaceBefore=10, spaceAfter=10)
+        self.category_names = dict(CareEntry.CATEGORIES)
+
+    def header(self, client, entry_count):
+        """Titel, Klientendaten und Überschrift der Einträge."""
+        story = [
+            Paragraph("MID Pflegedokumentation", self.title),
+            Paragraph("Meine Intensivpflege Daheim", self.subtitle),
+            Paragraph("Klientendaten", self.section_header),
+        ]
+
+        client_data = [
+            ['Name:', client.name],
+            ['Geburtsdatum:', client.birth_date.strftime('%d.%m.%Y') if client.birth_date else '-'],
+            ['Alter:', f'{client.age} Jahre' if client.age else '-'],
+            ['Pflegegrad:', f'Pflegegrad {client.care_level}' if client.care_level else '-'],
+            ['Adresse:', client.address or '-'],
+        ]
+        client_table = Table(client_data, colWidths=[4*cm, 12*cm])
+        client_table.setStyle(self.client_table)
+        story.append(client_table)
+
+        # Notizen
+        if client.notes:
+            story.append(Spacer(1, 10))
+            story.append(Paragraph(f"<b>Notizen:</b> {escape(client.notes)}", self.entry_text))
+
+        story.append(Spacer(1, 20))
+        story.append(Paragraph(f"Pflegeeinträge ({entry_count} Einträge)", self.section_header))
+        return story
+
+    def entry(self, entry):
+        """Flowables eines Eintrags: Kopfzeile und Text in einem Paragraph, dann die Trennlinie."""
+        category = self.category_names.get(entry.category, entry.category)
+        text = (
+            f"<b>{entry.recorded_at.strftime('%d.%m.%Y %H:%M')}</b> | "
+            f"<font color='#2E8B8B'>{escape(category)}</font> | "
+            f"Erfasst von: {escape(entry.recorded_by)}<br/>{escape(entry.description)}"
+        )
+        return [Paragraph(text, self.entry_text), copy(self.separator)]
+
+    def empty(self):
+        return [Paragraph("Keine Pflegeeinträge vorhanden.", self.entry_text)]
+
+    def footer_flowables(self):
+        footer_text = f"Erstellt am {datetime.now().strftime('%d.%m.%Y um %H:%M Uhr')} | MID Pflegedokumentation"
+        return [Spacer(1, 30), Paragraph(footer_text, self.footer)]
 
 
-def generate_client_report(client, entries):
+@lru_cache(maxsize=None)
+def report_template():
+    """Das Berichtslayout, einmal pro Prozess aufgebaut."""
+    return ReportTemplate()
+
+
+def generate_client_report(client, entries, output=None, entry_count=None):
     """
     Generiert einen PDF-Bericht für einen Klienten.
 
     Args:
         client: Client-Objekt mit allen Daten
-        entries: Liste der CareEntry-Objekte
+        entries: Liste oder Iterator der CareEntry-Objekte (z.B. Query mit yield_per)
+        output: Optionales Dateiobjekt, in das das PDF geschrieben wird
+        entry_count: Anzahl der Einträge, falls entries keine Liste ist
 
     Returns:
-        BytesIO: PDF als Byte-Stream
+        BytesIO bzw. output: PDF als Byte-Stream
     """
-    buffer = BytesIO()
+    buffer = output if output is not None else BytesIO()
+    if entry_count is None:
+        entry_count = len(entries)
+    template = report_template()
+
     doc = SimpleDocTemplate(
         buffer,
         pagesize=A4,
@@ -33,127 +183,19 @@ def generate_client_report(client, entries):
         bottomMargin=2*cm
     )
 
-    # Styles
-    styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(
-        name='MIDTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#2E8B8B'),
-        spaceAfter=20,
-        alignment=TA_CENTER
-    ))
-    styles.add(ParagraphStyle(
-        name='MIDSubtitle',
-        parent=styles['Normal'],
-        fontSize=12,
-        textColor=colors.grey,
-        alignment=TA_CENTER,
-        spaceAfter=30
-    ))
-    styles.add(ParagraphStyle(
-        name='SectionHeader',
-        parent=styles['Heading2'],
-        fontSize=14,
-        textColor=colors.HexColor('#2E8B8B'),
-        spaceBefore=20,
-        spaceAfter=10
-    ))
-    styles.add(ParagraphStyle(
-        name='EntryText',
-        parent=styles['Normal'],
-        fontSize=10,
-        leading=14
-    ))
-
-    # Content
-    story = []
-
-    # Header
-    story.append(Paragraph("MID Pflegedokumentation", styles['MIDTitle']))
-    story.append(Paragraph("Meine Intensivpflege Daheim", styles['MIDSubtitle']))
-
-    # Klienten-Info Box
-    story.append(Paragraph("Klientendaten", styles['SectionHeader']))
-
-    client_data = [
-        ['Name:', client.name],
-        ['Geburtsdatum:', client.birth_date.strftime('%d.%m.%Y') if client.birth_date else '-'],
-        ['Alter:', f'{client.age} Jahre' if client.age else '-'],
-        ['Pflegegrad:', f'Pflegegrad {client.care_level}' if client.care_level else '-'],
-        ['Adresse:', client.address or '-'],
-    ]
-
-    client_table = Table(client_data, colWidths=[4*cm, 12*cm])
-    client_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#E0F2F1')),
-        ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#2E8B8B')),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('PADDING', (0, 0), (-1, -1), 8),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#2E8B8B')),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-    ]))
-    story.append(client_table)
-
-    # Notizen
-    if client.notes:
-        story.append(Spacer(1, 10))
-        story.append(Paragraph(f"<b>Notizen:</b> {client.notes}", styles['EntryText']))
-
-    story.append(Spacer(1, 20))
-
-    # Pflegeeinträge
-    story.append(Paragraph(f"Pflegeeinträge ({len(entries)} Einträge)", styles['SectionHeader']))
-
-    if entries:
-        # Kategorien-Mapping für deutsche Namen
-        category_names = {
-            'grundpflege': 'Grundpflege',
-            'medikamente': 'Medikamente',
-            'vitalzeichen': 'Vitalzeichen',
-            'ernaehrung': 'Ernährung',
-            'mobilisation': 'Mobilisation',
-            'besonderheiten': 'Besonderheiten',
-        }
-
+    def entry_chunks():
+        """Erzeugt die Flowables blockweise, jeweils für einen Eintrag."""
+        has_entries = False
         for entry in entries:
-            # Entry Header
-            entry_date = entry.recorded_at.strftime('%d.%m.%Y %H:%M')
-            category = category_names.get(entry.category, entry.category)
-
-            entry_header = f"<b>{entry_date}</b> | <font color='#2E8B8B'>{category}</font> | Erfasst von: {entry.recorded_by}"
-            story.append(Paragraph(entry_header, styles['EntryText']))
+            has_entries = True
+            yield template.entry(entry)
 
-            # Entry Content
-            story.append(Paragraph(entry.description, styles['EntryText']))
-            story.append(Spacer(1, 10))
+        if not has_entries:
+            yield template.empty()
 
-            # Trennlinie
-            line_data = [['─' * 80]]
-            line_table = Table(line_data, colWidths=[16*cm])
-            line_table.setStyle(TableStyle([
-                ('TEXTCOLOR', (0, 0), (-1, -1), colors.lightgrey),
-                ('FONTSIZE', (0, 0), (-1, -1), 6),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ]))
-            story.append(line_table)
-            story.append(Spacer(1, 5))
-    else:
-        story.append(Paragraph("Keine Pflegeeinträge vorhanden.", styles['EntryText']))
-
-    # Footer
-    story.append(Spacer(1, 30))
-    footer_text = f"Erstellt am {datetime.now().strftime('%d.%m.%Y um %H:%M Uhr')} | MID Pflegedokumentation"
-    story.append(Paragraph(footer_text, ParagraphStyle(
-        name='Footer',
-        parent=styles['Normal'],
-        fontSize=8,
-        textColor=colors.grey,
-        alignment=TA_CENTER
-    )))
+        yield template.footer_flowables()
 
     # Build PDF
-    doc.build(story)
+    doc.build(_IncrementalStory(template.header(client, entry_count), entry_chunks()))
     buffer.seek(0)
     return buffer
@@ -0,0 +1,111 @@
+"""
+Schlanke Zeilen-Projektionen für Listenansichten.
+
+Listen brauchen nur wenige Spalten. Statt vollständiger ORM-Objekte (mit
+Lazy-Loads pro Zeile, z.B. entry.client) werden hier genau die benötigten
+Spalten in einer einzigen Abfrage gelesen und als unveränderliche Tupel
+zurückgegeben. Die Tupel bieten dieselben Hilfs-Properties wie die Modelle,
+damit die Templates unverändert bleiben.
+"""
+from collections import namedtuple
+from datetime import datetime
+from sqlalchemy import func
+from app import db
+from app.models import Client, CareEntry, ClientActivity, calculate_age
+
+# Länge der Vorschau auf dem Dashboard
+PREVIEW_LENGTH = 100
+
+
+class ClientRow(namedtuple('ClientRow', [
+    'id', 'name', 'birth_date', 'care_level', 'address', 'updated_at',
+    'entry_count', 'last_entry_at', 'last_entry_by_category'
+])):
+    """Ein Klient in der Klientenliste, mit Aktivität aus client_activity."""
+
+    @property
+    def age(self):
+        return calculate_age(self.birth_date)
+
+    @property
+    def last_entries(self):
+        """[(Kategorie-Label, datetime)], neueste zuerst."""
+        entries = [(CareEntry.category_label(category), datetime.fromisoformat(value))
+                   for category, value in (self.last_entry_by_category or {}).items()]
+        return sorted(entries, key=lambda item: item[1], reverse=True)
+
+
+class EntryRow(namedtuple('EntryRow', [
+    'id', 'category', 'description', 'recorded_by', 'recorded_at'
+])):
+    """Ein Pflegeeintrag in der Eintragsliste."""
+
+    archived = False
+
+    @property
+    def category_display(self):
+        return CareEntry.category_label(self.category)
+
+
+class RecentEntryRow(namedtuple('RecentEntryRow', [
+    'id', 'client_id', 'client_name', 'category', 'recorded_by',
+    'recorded_at', 'description', 'description_truncated'
+])):
+    """Ein Eintrag im Dashboard inkl. Klientenname und gekürzter Beschreibung."""
+
+    @property
+    def category_display(self):
+        return CareEntry.category_label(self.category)
+
+
+CLIENT_COLUMNS = (Client.id, Client.name, Client.birth_date, Client.care_level,
+                  Client.address, Client.updated_at, ClientActivity.entry_count,
+                  ClientActivity.last_entry_at, ClientActivity.last_entry_by_category)
+
+# Sortierungen der Klientenliste; "inactive" zeigt zuerst, wer am längsten nicht dokumentiert wurde
+CLIENT_ORDERINGS = {
+    'name': (Client.name,),
+    'activity': (ClientActivity.last_entry_at.desc().nulls_last(), Client.name),
+    'inactive': (ClientActivity.last_entry_at.asc().nulls_first(), Client.name),
+}
+
+ENTRY_COLUMNS = (CareEntry.id, CareEntry.category, CareEntry.description,
+                 CareEntry.recorded_by, CareEntry.recorded_at)
+
+
+def with_activity(query):
+    """Ergänzt eine Client-Query um client_activity (ein LEFT JOIN über den Primärschlüssel)."""
+    return query.outerjoin(ClientActivity, ClientActivity.client_id == Client.id)
+
+
+def client_rows(query):
+    """Projiziert eine Client-Query auf ClientRow-Tupel."""
+    return [ClientRow(*row) for row in with_activity(query).with_entities(*CLIENT_COLUMNS)]
+
+
+def entry_rows(query):
+    """Projiziert eine CareEntry-Query auf EntryRow-Tupel."""
+    return [EntryRow(*row) for row in query.with_entities(*ENTRY_COLUMNS)]
+
+
+def iter_entry_rows(query, chunk_size):
+    """Wie entry_rows, liest aber blockweise per Server-Side-Cursor (yield_per)."""
+    for row in query.with_entities(*ENTRY_COLUMNS).yield_per(chunk_size):
+        yield EntryRow(*row)
+
+
+def recent_entry_rows(limit=10):
+    """
+    Die neuesten Pflegeeinträge aller Klienten.
+
+    Klientenname per JOIN, Beschreibung serverseitig gekürzt - eine Abfrage.
+    """
+    query = db.session.query(
+        CareEntry.id, CareEntry.client_id, Client.name, CareEntry.category,
+        CareEntry.recorded_by, CareEntry.recorded_at,
+        func.substr(CareEntry.description, 1, PREVIEW_LENGTH),
+        func.length(CareEntry.description) > PREVIEW_LENGTH
+    ).join(Client, CareEntry.client_id == Client.id).order_by(
+        CareEntry.recorded_at.desc()
+    ).limit(limit)
+    return [RecentEntryRow(*row) for row in query]
@@ -0,0 +1,121 @@
+"""
+Löschen von Klienten samt Pflegeeinträgen.
+
+Einträge und Archiv-Manifeste werden mengenbasiert gelöscht (ein DELETE pro
+Tabelle), statt dass die ORM-Kaskade jeden Eintrag in die Session lädt und
+einzeln löscht (Client.entries hat passive_deletes). Auf PostgreSQL sorgt
+zusätzlich ON DELETE CASCADE dafür, dass auch ein direkt per SQL gelöschter
+Klient keine Einträge zurücklässt.
+
+Nach dem Commit werden Archivdateien und gecachte PDF-Berichte entfernt.
+
+Klienten mit mehr als CLIENT_PURGE_BACKGROUND_THRESHOLD Einträgen werden im
+Export-Pool gelöscht: Einträge in Blöcken zu CLIENT_PURGE_BATCH_SIZE, jeder
+Block in einer eigenen kurzen Transaktion, zuletzt der Klient selbst. Ein
+Marker im Export-Cache zeigt allen gunicorn-Workern, dass der Auftrag läuft.
+"""
+import os
+import time
+from flask import current_app
+from sqlalchemy import func, select
+from app import db
+from app.models import Client, CareEntry, ClientActivity, EntryArchive
+from app.archive import remove_client_files
+from app import exports
+
+
+def _marker_path(client_id):
+    directory = current_app.config['EXPORT_CACHE_DIR']
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f'purge-{client_id}.pending')
+
+
+def purge_pending(client_id):
+    """True, solange ein Hintergrund-Löschauftrag für den Klienten läuft."""
+    path = _marker_path(client_id)
+    if not os.path.exists(path):
+        return False
+    # Der Job frischt den Marker nach jedem Block auf; abgestürzte Jobs verfallen
+    return time.time() - os.path.getmtime(path) <= current_app.config['EXPORT_JOB_TIMEOUT']
+
+
+def _cleanup_files(client_id):
+    remove_client_files(client_id)
+    exports.discard_reports(client_id)
+
+
+def delete_client(client):
+    """Löscht einen Klienten mit allen Einträgen und Archivdaten in einer Transaktion."""
+    client_id = client.id
+    CareEntry.query.filter(CareEntry.client_id == client_id).delete(synchronize_session=False)
+    EntryArchive.query.filter(EntryArchive.client_id == client_id).delete(synchronize_session=False)
+    ClientActivity.query.filter(ClientActivity.client_id == client_id).delete(synchronize_session=False)
+    db.session.delete(client)
+    db.session.commit()
+    _cleanup_files(client_id)
+
+
+def _has_many_entries(client_id, threshold):
+    """Zählt höchstens threshold + 1 Einträge - die Abfrage bleibt billig."""
+    limited = select(CareEntry.id).where(CareEntry.client_id == client_id).limit(threshold + 1)
+    return db.session.scalar(select(func.count()).select_from(limited.subquery())) > threshold
+
+
+def delete_or_enqueue(client):
+    """
+    Löscht einen Klienten sofort oder - bei sehr langem Verlauf - im Hintergrund.
+
+    Returns:
+        'deleted', 'enqueued' oder 'pending' (Auftrag läuft bereits)
+    """
+    if purge_pending(client.id):
+        return 'pending'
+    if not _has_many_entries(client.id, current_app.config['CLIENT_PURGE_BACKGROUND_THRESHOLD']):
+        delete_client(client)
+        return 'deleted'
+
+    with open(_marker_path(client.id), 'w'):
+        pass
+    exports.get_executor().submit(_run_purge, client.id)
+    return 'enqueued'
+
+
+def purge_entries(client_id, batch_size, progress=None):
+    """
+    Löscht die Einträge eines Klienten blockweise, jeden Block in eigener Transaktion.
+
+    Returns:
+        Anzahl gelöschter Einträge
+    """
+    total = 0
+    while True:
+        batch = select(CareEntry.id).where(CareEntry.client_id == client_id).limit(batch_size)
+        deleted = CareEntry.query.filter(
+            CareEntry.client_id == client_id, CareEntry.id.in_(batch)
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        if not deleted:
+            return total
+        total += deleted
+        if progress:
+            progress(total)
+
+
+def _run_purge(client_id):
+    """Läuft im Pool-Prozess: löscht den Klienten blockweise."""
+    with exports.worker_app().app_context():
+        marker = _marker_path(client_id)
+        try:
+            purge_entries(client_id, current_app.config['CLIENT_PURGE_BATCH_SIZE'],
+                          progress=lambda _: os.utime(marker))
+            client = db.session.get(Client, client_id)
+            if client is not None:
+                delete_client(client)
+            else:
+                _cleanup_files(client_id)
+        finally:
+            try:
+                os.unlink(marker)
+            except FileNotFoundError:
+                pass
+            db.session.remove()
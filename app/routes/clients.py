@@ -1,10 +1,19 @@
+from datetime import datetime, time, timedelta
 from functools import wraps
-from flask import Blueprint, render_template, redirect, url_for, flash, request, abort, send_file
+from flask import (Blueprint, render_template, redirect, url_for, flash, request, abort, send_file, jsonify,
+                   Response, stream_with_context, current_app)
 from flask_login import login_required, current_user
 from app import db
-from app.models import Client, CareEntry
-from app.forms import ClientForm
-from app.pdf_generator import generate_client_report
+from app.models import Client
+from app.forms import ClientForm, BulkExportForm
+from app.pagination import paginate_entries
+from app.projections import client_rows, CLIENT_ORDERINGS
+from app.search import search_clients
+from app.db_routing import read_only
+from app.purge import delete_or_enqueue
+from app.http_cache import conditional
+from app.exports import (JOB_ID_PATTERN, client_version, report_job_id, report_path, job_status,
+                         store_report, enqueue_report, iter_bulk_zip)
 
 
 def admin_required(f):
@@ -21,16 +30,39 @@ clients_bp = Blueprint('clients', __name__)
 
 
 @clients_bp.route('/')
+@read_only
 @login_required
 def list():
     search = request.args.get('search', '')
+    sort = request.args.get('sort', 'name')
+    if sort not in CLIENT_ORDERINGS:
+        sort = 'name'
+    limit = current_app.config['CLIENT_SEARCH_LIMIT']
     if search:
-        clients = Client.query.filter(
-            Client.name.ilike(f'%{search}%')
-        ).order_by(Client.name).all()
+        # Treffer bleiben nach Relevanz sortiert
+        clients = search_clients(search, limit=limit)
     else:
-        clients = Client.query.order_by(Client.name).all()
-    return render_template('clients/list.html', clients=clients, search=search)
+        clients = client_rows(Client.query.order_by(*CLIENT_ORDERINGS[sort]))
+    return render_template('clients/list.html', clients=clients, search=search, sort=sort,
+                           limit_reached=bool(search) and len(clients) >= limit)
+
+
+@clients_bp.route('/search')
+@read_only
+@login_required
+def typeahead():
+    """JSON-Vorschläge für die Suchleiste."""
+    clients = search_clients(request.args.get('q', ''),
+                             limit=current_app.config['CLIENT_TYPEAHEAD_LIMIT'])
+    return jsonify([
+        {
+            'id': client.id,
+            'name': client.name,
+            'address': client.address,
+            'url': url_for('clients.detail', id=client.id),
+        }
+        for client in clients
+    ])
 
 
 @clients_bp.route('/new', methods=['GET', 'POST'])
@@ -53,11 +85,14 @@ def create():
 
 
 @clients_bp.route('/<int:id>')
+@read_only
 @login_required
+@conditional(client_version)
 def detail(id):
     client = Client.query.get_or_404(id)
-    entries = client.entries.order_by(CareEntry.recorded_at.desc()).limit(20).all()
-    return render_template('clients/detail.html', client=client, entries=entries)
+    page = paginate_entries(client.id, per_page=20)
+    return render_template('clients/detail.html', client=client,
+                           entries=page.items, page=page)
 
 
 @clients_bp.route('/<int:id>/edit', methods=['GET', 'POST'])
@@ -90,27 +125,113 @@ def edit(id):
 def delete(id):
     client = Client.query.get_or_404(id)
     name = client.name
-    db.session.delete(client)
-    db.session.commit()
-    flash(f'Klient "{name}" wurde gelöscht.', 'warning')
+    status = delete_or_enqueue(client)
+    if status == 'deleted':
+        flash(f'Klient "{name}" wurde gelöscht.', 'warning')
+    elif status == 'enqueued':
+        flash(f'Klient "{name}" hat einen sehr langen Verlauf und wird im Hintergrund gelöscht.', 'warning')
+    else:
+        flash(f'Klient "{name}" wird bereits im Hintergrund gelöscht.', 'info')
     return redirect(url_for('clients.list'))
 
 
 @clients_bp.route('/<int:id>/export')
+@read_only
 @login_required
+@conditional(client_version)
 def export_pdf(id):
     """Exportiert alle Pflegeeinträge eines Klienten als PDF."""
     client = Client.query.get_or_404(id)
-    entries = client.entries.order_by(CareEntry.recorded_at.desc()).all()
 
-    pdf_buffer = generate_client_report(client, entries)
+    # Unveränderte Klienten kommen direkt aus dem Cache. Rendert ein
+    # Hintergrund-Job denselben Stand, nicht blockieren und nicht doppelt
+    # rendern, sondern auf dessen Status verweisen.
+    job_id = report_job_id(client)
+    status = job_status(job_id)
+    if status == 'pending':
+        return _export_job_response(job_id, status), 202
+    if status != 'done':
+        store_report(client, job_id)
+
+    return _send_report(client, job_id)
+
+
+@clients_bp.route('/<int:id>/export/jobs', methods=['POST'])
+@login_required
+def enqueue_export(id):
+    """Startet den PDF-Export im Hintergrund."""
+    client = Client.query.get_or_404(id)
+    job_id, status = enqueue_report(client)
+    return _export_job_response(job_id, status), 200 if status == 'done' else 202
+
+
+@clients_bp.route('/export/jobs/<job_id>')
+@read_only
+@login_required
+def export_status(job_id):
+    """Liefert den Status eines Export-Jobs."""
+    if not JOB_ID_PATTERN.match(job_id):
+        abort(404)
+    status = job_status(job_id)
+    if status is None:
+        abort(404)
+    return _export_job_response(job_id, status)
+
+
+@clients_bp.route('/export/jobs/<job_id>/download')
+@read_only
+@login_required
+def export_download(job_id):
+    """Liefert das fertige PDF eines Export-Jobs aus."""
+    match = JOB_ID_PATTERN.match(job_id)
+    if not match or job_status(job_id) != 'done':
+        abort(404)
+    client = Client.query.get_or_404(int(match.group(1)))
+    return _send_report(client, job_id)
+
+
+@clients_bp.route('/export/bulk', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def bulk_export():
+    """Exportiert die Berichte mehrerer (oder aller) Klienten als ZIP-Archiv."""
+    form = BulkExportForm()
+    form.clients.choices = [
+        (client_id, name) for client_id, name in
+        Client.query.with_entities(Client.id, Client.name).order_by(Client.name)
+    ]
+
+    if form.validate_on_submit():
+        client_ids = form.clients.data or [client_id for client_id, _ in form.clients.choices]
+        date_from = datetime.combine(form.date_from.data, time.min) if form.date_from.data else None
+        # Enddatum inklusive
+        date_to = datetime.combine(form.date_to.data + timedelta(days=1), time.min) if form.date_to.data else None
+
+        filename = f"Pflegeberichte_{datetime.now().strftime('%Y%m%d')}.zip"
+        return Response(
+            stream_with_context(iter_bulk_zip(client_ids, date_from, date_to)),
+            mimetype='application/zip',
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+        )
+
+    return render_template('clients/bulk_export.html', form=form)
+
+
+def _export_job_response(job_id, status):
+    return jsonify(
+        job_id=job_id,
+        status=status,
+        status_url=url_for('clients.export_status', job_id=job_id),
+        download_url=url_for('clients.export_download', job_id=job_id) if status == 'done' else None
+    )
+
 
+def _send_report(client, job_id):
     # Dateiname: Klientenname_Datum.pdf
-    from datetime import datetime
     filename = f"Pflegebericht_{client.name.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d')}.pdf"
 
     return send_file(
-        pdf_buffer,
+        report_path(job_id),
         mimetype='application/pdf',
         as_attachment=True,
         download_name=filename
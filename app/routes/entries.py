@@ -1,18 +1,122 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from datetime import datetime, time, timedelta
+from itertools import chain
+from flask import (Blueprint, render_template, stream_template, redirect, url_for, flash, request,
+                   current_app, jsonify, Response, stream_with_context)
 from flask_login import login_required, current_user
 from app import db
 from app.models import Client, CareEntry
-from app.forms import CareEntryForm
+from app.forms import CareEntryForm, EntrySearchForm, EntryExportForm
+from app.pagination import paginate_entries, iter_all_entries
+from app.fulltext import search_entries
+from app.ingest import IngestError, parse_batch, ingest_batch
+from app.db_routing import read_only
+from app.exports import client_version
+from app.http_cache import conditional
+from app.entry_export import EntryFilter, MIMETYPES, iter_export, export_filename
+from app.routes.clients import admin_required
 
 entries_bp = Blueprint('entries', __name__)
 
 
 @entries_bp.route('/client/<int:client_id>')
+@read_only
 @login_required
+@conditional(client_version, arg='client_id')
 def list(client_id):
     client = Client.query.get_or_404(client_id)
-    entries = client.entries.order_by(CareEntry.recorded_at.desc()).all()
-    return render_template('entries/list.html', client=client, entries=entries)
+    if request.args.get('all'):
+        return _stream_history(client)
+    page = paginate_entries(
+        client.id,
+        before=request.args.get('before'),
+        after=request.args.get('after'),
+        per_page=current_app.config['ENTRIES_PER_PAGE']
+    )
+    return render_template('entries/list.html', client=client,
+                           entries=page.items, page=page)
+
+
+def _buffered(chunks, size):
+    """Fasst die vielen kleinen Template-Stücke zu Blöcken von etwa size Zeichen zusammen."""
+    buffer = []
+    length = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield ''.join(buffer)
+            buffer = []
+            length = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def _stream_history(client):
+    """
+    Gesamter Verlauf auf einer Seite, gestreamt.
+
+    Kopf und erste Einträge gehen sofort an den Browser; die weiteren Zeilen
+    werden per Server-Side-Cursor nachgeladen und blockweise gesendet.
+    """
+    config = current_app.config
+    entries = iter_all_entries(client.id, chunk_size=config['ENTRIES_STREAM_CHUNK_SIZE'])
+    first = next(entries, None)
+    chunks = stream_template('entries/list.html', client=client, page=None,
+                             entries=chain([first], entries) if first else [])
+    return current_app.response_class(_buffered(chunks, config['ENTRIES_STREAM_BUFFER']))
+
+
+@entries_bp.route('/search')
+@read_only
+@login_required
+def search():
+    """Volltextsuche über alle Pflegeeinträge."""
+    form = EntrySearchForm(request.args)
+    form.client_id.choices = [('', '-- Alle Klienten --')] + [
+        (str(client_id), name) for client_id, name in
+        Client.query.with_entities(Client.id, Client.name).order_by(Client.name)
+    ]
+
+    results = None
+    if request.args and form.validate():
+        date_from = datetime.combine(form.date_from.data, time.min) if form.date_from.data else None
+        # Enddatum inklusive
+        date_to = datetime.combine(form.date_to.data + timedelta(days=1), time.min) if form.date_to.data else None
+        results = search_entries(
+            form.q.data,
+            client_id=form.client_id.data,
+            category=form.category.data or None,
+            date_from=date_from,
+            date_to=date_to,
+            limit=current_app.config['ENTRY_SEARCH_LIMIT']
+        )
+
+    return render_template('entries/search.html', form=form, results=results)
+
+
+@entries_bp.route('/export', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def export():
+    """Exportiert die Pflegeeinträge aller Klienten als CSV oder XLSX (gestreamt)."""
+    form = EntryExportForm()
+
+    if form.validate_on_submit():
+        selection = EntryFilter(
+            date_from=datetime.combine(form.date_from.data, time.min) if form.date_from.data else None,
+            # Enddatum inklusive
+            date_to=datetime.combine(form.date_to.data + timedelta(days=1), time.min) if form.date_to.data else None,
+            category=form.category.data or None,
+            recorded_by=(form.recorded_by.data or '').strip() or None,
+        )
+        fmt = form.format.data
+        return Response(
+            stream_with_context(iter_export(selection, fmt)),
+            mimetype=MIMETYPES[fmt],
+            headers={'Content-Disposition': f'attachment; filename="{export_filename(selection, fmt)}"'}
+        )
+
+    return render_template('entries/export.html', form=form)
 
 
 @entries_bp.route('/client/<int:client_id>/new', methods=['GET', 'POST'])
@@ -40,6 +144,31 @@ def create(client_id):
     return render_template('entries/form.html', form=form, client=client)
 
 
+@entries_bp.route('/bulk', methods=['POST'])
+@login_required
+def bulk_create():
+    """
+    Legt viele Pflegeeinträge in einem Request an (JSON oder CSV).
+
+    Mit ?atomic=1 wird bei einem fehlerhaften Eintrag nichts gespeichert.
+    """
+    try:
+        rows = parse_batch(request)
+    except IngestError as e:
+        return jsonify(error=str(e)), 400
+    if len(rows) > current_app.config['BULK_INGEST_MAX_ROWS']:
+        return jsonify(error=f"Maximal {current_app.config['BULK_INGEST_MAX_ROWS']} Einträge pro Batch."), 413
+
+    results = ingest_batch(rows, default_recorded_by=current_user.name,
+                           atomic=request.args.get('atomic') == '1')
+    created = sum(1 for result in results if result['status'] == 'created')
+    return jsonify(
+        created=created,
+        failed=sum(1 for result in results if result['status'] == 'error'),
+        results=results
+    ), 201 if created == len(results) else 422 if not created else 207
+
+
 @entries_bp.route('/<int:id>/delete', methods=['POST'])
 @login_required
 def delete(id):
@@ -1,27 +1,22 @@
 from flask import Blueprint, render_template
 from flask_login import login_required
-from app.models import Client, CareEntry
-from datetime import datetime, timedelta
+from app.db_routing import read_only
+from app.models import CareEntry
+from app.stats import get_dashboard_stats
 
 main_bp = Blueprint('main', __name__)
 
 
 @main_bp.route('/')
+@read_only
 @login_required
 def dashboard():
-    # Statistiken
-    client_count = Client.query.count()
-    today = datetime.utcnow().date()
-    today_entries = CareEntry.query.filter(
-        CareEntry.recorded_at >= datetime.combine(today, datetime.min.time())
-    ).count()
-
-    # Letzte Einträge
-    recent_entries = CareEntry.query.order_by(
-        CareEntry.recorded_at.desc()
-    ).limit(10).all()
+    # Statistiken und letzte Einträge (gecacht, siehe app/stats.py)
+    stats = get_dashboard_stats()
 
     return render_template('dashboard.html',
-                           client_count=client_count,
-                           today_entries=today_entries,
-                           recent_entries=recent_entries)
+                           client_count=stats.client_count,
+                           today_entries=stats.today_entries,
+                           today_by_category=stats.today_by_category,
+                           categories=CareEntry.CATEGORIES,
+                           recent_entries=stats.recent_entries)
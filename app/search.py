@@ -0,0 +1,117 @@
+"""
+Klientensuche mit Trigramm-Ranking.
+
+Auf PostgreSQL läuft die Suche über GIN-Trigramm-Indizes (pg_trgm) auf
+clients.name und clients.address. Treffer werden nach Ähnlichkeit sortiert,
+Namen, die mit dem Suchbegriff beginnen, stehen vorne.
+
+Für SQLite (Tests, lokale Entwicklung) gibt es einen reinen Python-Pfad mit
+derselben Trigramm-Logik wie pg_trgm.
+"""
+import re
+import threading
+from sqlalchemy import case, func, literal, or_
+from app import db
+from app.models import Client
+from app.projections import ClientRow, CLIENT_COLUMNS, with_activity
+
+# Mindestähnlichkeit für Treffer ohne Teilstring-Übereinstimmung (wie pg_trgm)
+SIMILARITY_THRESHOLD = 0.3
+# Adresstreffer zählen weniger als Namenstreffer
+ADDRESS_WEIGHT = 0.5
+PREFIX_BONUS = 1.0
+
+_WORD = re.compile(r'\w+')
+
+_trigram_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _escape_like(term):
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def trigrams(text):
+    """Trigramm-Menge eines Textes, analog zu pg_trgm (Wörter mit Leerzeichen gepolstert)."""
+    result = set()
+    for word in _WORD.findall((text or '').lower()):
+        padded = f'  {word} '
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+def similarity(a, b):
+    """Jaccard-Ähnlichkeit zweier Trigramm-Mengen (entspricht similarity() in pg_trgm)."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def search_clients(term, limit=50):
+    """
+    Sucht Klienten nach Name (und Adresse), sortiert nach Relevanz.
+
+    Args:
+        term: Suchbegriff
+        limit: Maximale Anzahl Treffer
+
+    Returns:
+        Liste von ClientRow-Tupeln
+    """
+    term = (term or '').strip()
+    if not term:
+        return []
+    if db.session.get_bind().dialect.name == 'postgresql':
+        return _search_postgresql(term, limit)
+    return _search_python(term, limit)
+
+
+def _search_postgresql(term, limit):
+    pattern = f'%{_escape_like(term)}%'
+    prefix = f'{_escape_like(term)}%'
+    score = (
+        func.greatest(
+            func.similarity(Client.name, term),
+            func.similarity(func.coalesce(Client.address, ''), term) * ADDRESS_WEIGHT
+        )
+        + case((Client.name.ilike(prefix, escape='\\'), PREFIX_BONUS), else_=literal(0.0))
+    )
+    query = with_activity(Client.query).filter(or_(
+        Client.name.op('%')(term),
+        Client.name.ilike(pattern, escape='\\'),
+        Client.address.ilike(pattern, escape='\\'),
+    )).with_entities(*CLIENT_COLUMNS).order_by(score.desc(), Client.name).limit(limit)
+    return [ClientRow(*row) for row in query]
+
+
+def _client_trigrams(row):
+    """Trigramme pro Klient, gecacht bis zur nächsten Änderung (updated_at)."""
+    cached = _trigram_cache.get(row.id)
+    if cached and cached[0] == row.updated_at:
+        return cached[1], cached[2]
+    name_trgm, address_trgm = trigrams(row.name), trigrams(row.address)
+    with _cache_lock:
+        _trigram_cache[row.id] = (row.updated_at, name_trgm, address_trgm)
+    return name_trgm, address_trgm
+
+
+def _search_python(term, limit):
+    needle = term.lower()
+    term_trgm = trigrams(term)
+    scored = []
+    for row in with_activity(Client.query).with_entities(*CLIENT_COLUMNS):
+        row = ClientRow(*row)
+        name_trgm, address_trgm = _client_trigrams(row)
+        name = row.name.lower()
+        address = (row.address or '').lower()
+
+        name_score = similarity(term_trgm, name_trgm)
+        if not (name_score >= SIMILARITY_THRESHOLD or needle in name or needle in address):
+            continue
+        score = max(name_score, similarity(term_trgm, address_trgm) * ADDRESS_WEIGHT)
+        if name.startswith(needle):
+            score += PREFIX_BONUS
+        scored.append((-score, row.name, row))
+
+    scored.sort(key=lambda item: item[:2])
+    return [row for _, _, row in scored[:limit]]
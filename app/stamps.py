@@ -0,0 +1,33 @@
+"""
+Gemeinsame Zeitstempel-Dateien für die Cache-Invalidierung über Prozesse.
+
+Jeder gunicorn-Worker hält eigene Caches. Wer Daten ändert, erhöht die
+mtime einer Stempeldatei; die anderen Worker vergleichen sie per stat()
+mit dem Stand ihrer letzten Berechnung.
+"""
+import os
+import time
+
+
+def read_stamp(path):
+    """mtime der Stempeldatei in Nanosekunden (0, wenn sie fehlt)."""
+    if not path:
+        return 0
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+
+def touch_stamp(path):
+    """Erhöht die mtime der Stempeldatei streng monoton."""
+    if not path:
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        previous = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        open(path, 'a').close()
+        previous = 0
+    stamp = max(time.time_ns(), previous + 1)
+    os.utime(path, ns=(stamp, stamp))
@@ -0,0 +1,72 @@
+"""
+Start der Worker.
+
+- Jinja-Templates werden als Bytecode unter JINJA_BYTECODE_CACHE_DIR
+  abgelegt; ein neuer Prozess übersetzt sie nicht erneut, solange sich der
+  Quelltext nicht ändert.
+- prepare_fork() übersetzt alle Templates vorab und friert den Heap ein
+  (gc.freeze). gunicorn.conf.py ruft es mit preload_app im Master auf; die
+  Worker übernehmen Module, App und Templates per Copy-on-Write, ohne dass
+  der Garbage Collector die geteilten Seiten anfasst und damit kopiert.
+- after_fork() verwirft im Worker die vom Master geerbten DB-Verbindungen.
+- heartbeat(): Ein sync-Worker meldet sich beim Master nur zwischen zwei
+  Requests und wird nach `timeout` Sekunden ohne Meldung beendet. Lange
+  Downloads (app/entry_export.py) rufen heartbeat() nach jedem Block auf;
+  gunicorn.conf.py hinterlegt dafür in post_fork() worker.notify.
+
+Schwere Bibliotheken (reportlab für PDF-Berichte, flask_migrate/alembic für
+die CLI) werden erst beim ersten Gebrauch importiert.
+"""
+import gc
+import os
+from jinja2 import FileSystemBytecodeCache
+
+# worker.notify des gunicorn-Workers, sonst None (Entwicklungsserver, CLI)
+_notify = None
+
+
+def init_app(app):
+    directory = app.config['JINJA_BYTECODE_CACHE_DIR']
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory)
+
+
+def precompile_templates(app):
+    """Lädt alle Templates in den Template-Cache der App; liefert die Anzahl."""
+    names = app.jinja_env.list_templates(extensions=('html',))
+    for name in names:
+        app.jinja_env.get_template(name)
+    return len(names)
+
+
+def prepare_fork(app):
+    """Im Master vor dem Forken der Worker (gunicorn preload_app)."""
+    precompile_templates(app)
+    with app.app_context():
+        from app import db
+        # Keine Verbindung des Masters darf in die Worker gelangen
+        for engine in db.engines.values():
+            engine.dispose()
+    gc.collect()
+    gc.freeze()
+
+
+def after_fork(app):
+    """Im Worker direkt nach dem Fork."""
+    with app.app_context():
+        from app import db
+        # close=False: die Verbindungen gehören noch dem Master
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def register_heartbeat(notify):
+    global _notify
+    _notify = notify
+
+
+def heartbeat():
+    """Meldet dem gunicorn-Master, dass der Worker noch arbeitet."""
+    if _notify is not None:
+        _notify()
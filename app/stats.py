@@ -0,0 +1,140 @@
+"""
+Dashboard-Statistiken mit Cache.
+
+Die Kennzahlen (Klienten gesamt, Einträge heute, Einträge je Kategorie heute
+und die letzten Einträge) werden pro Prozess zwischengespeichert. Jede
+Änderung an Client oder CareEntry markiert den Cache per SQLAlchemy-Event als
+veraltet; nach dem Commit wird ein Zeitstempel in DASHBOARD_STATS_FILE
+erhöht. Alle gunicorn-Worker vergleichen diesen Stempel (ein stat()-Aufruf)
+und rechnen nur neu, wenn sich seit ihrer letzten Berechnung etwas geändert
+hat.
+"""
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+from flask import current_app, has_app_context
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session, object_session
+from app import db
+from app.models import Client, CareEntry
+from app.projections import recent_entry_rows
+from app.stamps import read_stamp, touch_stamp
+from app.db_routing import reading_from_replica
+
+SESSION_FLAG = 'dashboard_stats_stale'
+
+_lock = threading.Lock()
+_cached = {'key': None, 'stats': None, 'expires': 0}
+_local_generation = 0
+
+
+DashboardStats = namedtuple('DashboardStats', [
+    'client_count', 'today_entries', 'today_by_category', 'recent_entries'
+])
+
+
+def _stamp_file():
+    if has_app_context():
+        return current_app.config.get('DASHBOARD_STATS_FILE')
+    return None
+
+
+def _generation():
+    """Aktueller Stand: lokaler Zähler plus gemeinsamer Zeitstempel."""
+    return _local_generation, read_stamp(_stamp_file())
+
+
+def invalidate_dashboard_stats():
+    """Verwirft den Cache in diesem und allen anderen Worker-Prozessen."""
+    global _local_generation
+    with _lock:
+        _local_generation += 1
+        _cached['key'] = None
+    touch_stamp(_stamp_file())
+
+
+def _compute(today_start):
+    client_count = Client.query.count()
+
+    today_by_category = dict(
+        db.session.query(CareEntry.category, func.count(CareEntry.id))
+        .filter(CareEntry.recorded_at >= today_start)
+        .group_by(CareEntry.category)
+        .all()
+    )
+
+    recent_entries = recent_entry_rows(limit=10)
+
+    return DashboardStats(
+        client_count=client_count,
+        today_entries=sum(today_by_category.values()),
+        today_by_category=today_by_category,
+        recent_entries=recent_entries
+    )
+
+
+def get_dashboard_stats():
+    """
+    Liefert die Dashboard-Kennzahlen, bei unverändertem Datenstand aus dem Cache.
+
+    Returns:
+        DashboardStats
+    """
+    today_start = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+    # Stand vor der Berechnung lesen: eine parallele Änderung führt so beim
+    # nächsten Aufruf sicher zur Neuberechnung.
+    key = (_generation(), today_start)
+
+    with _lock:
+        if _cached['key'] == key and time.monotonic() < _cached['expires']:
+            return _cached['stats']
+
+    stats = _compute(today_start)
+    # Vom Replica gelesen, fehlen evtl. die letzten Änderungen: dann nur so
+    # lange cachen, wie das Replica maximal hinterherhängen darf
+    expires = float('inf')
+    if reading_from_replica():
+        expires = time.monotonic() + current_app.config['REPLICA_MAX_LAG']
+    with _lock:
+        _cached['key'] = key
+        _cached['stats'] = stats
+        _cached['expires'] = expires
+    return stats
+
+
+# --- Invalidierung -----------------------------------------------------------
+
+def _mark_stale(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info[SESSION_FLAG] = True
+    else:
+        invalidate_dashboard_stats()
+
+
+for _model in (Client, CareEntry):
+    for _event in ('after_insert', 'after_update', 'after_delete'):
+        event.listen(_model, _event, _mark_stale)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _mark_stale_on_bulk(orm_execute_state):
+    """Bulk-Statements (Query.delete(), insert(CareEntry) ...) lösen keine Mapper-Events aus."""
+    if orm_execute_state.is_select:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ in (Client, CareEntry):
+        orm_execute_state.session.info[SESSION_FLAG] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    if session.info.pop(SESSION_FLAG, False):
+        invalidate_dashboard_stats()
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _reset_after_rollback(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop(SESSION_FLAG, None)
@@ -0,0 +1,151 @@
+"""
+Benutzer-Cache für den Flask-Login user_loader.
+
+Ohne Cache kostet jeder angemeldete Request einen SELECT auf users, bevor
+die eigentliche Route läuft. Stattdessen hält jeder Worker eine LRU-Liste
+geladener Benutzer (USER_CACHE_SIZE Einträge) und bindet sie pro Request per
+session.merge(load=False) ohne Datenbankzugriff an die Session.
+
+Änderungen an User (Deaktivierung, Rolle, Stammdaten) verwerfen den Eintrag
+nach dem Commit sofort und erhöhen den Zeitstempel in USER_CACHE_STAMP_FILE,
+worauf alle anderen Worker ihren Cache leeren. Unabhängig davon lebt ein
+Eintrag höchstens USER_CACHE_TTL Sekunden - so lange kann ein deaktivierter
+Benutzer schlimmstenfalls noch als aktiv gelten (z.B. bei Änderungen direkt
+in der Datenbank). USER_CACHE_TTL = 0 schaltet den Cache ab.
+"""
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session, make_transient_to_detached
+from app import db
+from app.models import User
+from app.stamps import read_stamp, touch_stamp
+from app.db_routing import primary_reads
+
+SESSION_KEY = 'user_cache_stale'
+ALL_USERS = object()
+
+_lock = threading.Lock()
+_users = OrderedDict()  # user_id -> (gültig bis, losgelöster User)
+_state = {'local': 0, 'shared': None}
+
+
+def _stamp_file():
+    if has_app_context():
+        return current_app.config.get('USER_CACHE_STAMP_FILE')
+    return None
+
+
+def _generation():
+    """Stand des Caches; leert ihn, wenn ein anderer Worker invalidiert hat."""
+    shared = read_stamp(_stamp_file())
+    with _lock:
+        if _state['shared'] != shared:
+            _users.clear()
+            _state['shared'] = shared
+        return _state['local'], shared
+
+
+def _snapshot(user):
+    """Losgelöste Kopie mit allen Spalten, unabhängig von der Request-Session."""
+    copy = User(**{column.key: getattr(user, column.key) for column in User.__mapper__.column_attrs})
+    make_transient_to_detached(copy)
+    return copy
+
+
+def load_user(user_id):
+    """
+    Lädt einen Benutzer für Flask-Login, wenn möglich aus dem Cache.
+
+    Returns:
+        User (an db.session gebunden) oder None
+    """
+    config = current_app.config
+    ttl = config['USER_CACHE_TTL']
+    if not ttl:
+        with primary_reads():
+            return db.session.get(User, user_id)
+
+    generation = _generation()
+    now = time.monotonic()
+    with _lock:
+        cached = _users.get(user_id)
+        if cached is not None and cached[0] > now:
+            _users.move_to_end(user_id)
+            snapshot = cached[1]
+        else:
+            _users.pop(user_id, None)
+            snapshot = None
+
+    if snapshot is not None:
+        return db.session.merge(snapshot, load=False)
+
+    # Nie vom Replica: ein verzögertes is_active bliebe sonst bis zum TTL im Cache
+    with primary_reads():
+        user = db.session.get(User, user_id)
+    if user is None:
+        return None
+    snapshot = _snapshot(user)
+    with _lock:
+        # Nicht speichern, wenn während des Ladens invalidiert wurde
+        if (_state['local'], _state['shared']) == generation:
+            _users[user_id] = (now + ttl, snapshot)
+            _users.move_to_end(user_id)
+            while len(_users) > config['USER_CACHE_SIZE']:
+                _users.popitem(last=False)
+    return user
+
+
+def invalidate_user(user_id=None):
+    """Verwirft einen Benutzer (oder ohne user_id alle) in allen Worker-Prozessen."""
+    with _lock:
+        _state['local'] += 1
+        if user_id is None:
+            _users.clear()
+        else:
+            _users.pop(user_id, None)
+    touch_stamp(_stamp_file())
+
+
+# --- Invalidierung -----------------------------------------------------------
+
+def _mark_changed(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(SESSION_KEY, set()).add(target.id)
+    else:
+        invalidate_user(target.id)
+
+
+event.listen(User, 'after_update', _mark_changed)
+event.listen(User, 'after_delete', _mark_changed)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _mark_changed_on_bulk(orm_execute_state):
+    """Bulk-UPDATE/DELETE auf users lösen keine Mapper-Events aus."""
+    if orm_execute_state.is_select:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ is User:
+        orm_execute_state.session.info.setdefault(SESSION_KEY, set()).add(ALL_USERS)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    changed = session.info.pop(SESSION_KEY, None)
+    if not changed:
+        return
+    if ALL_USERS in changed:
+        invalidate_user()
+    else:
+        for user_id in changed:
+            invalidate_user(user_id)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _reset_after_rollback(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop(SESSION_KEY, None)
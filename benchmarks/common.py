@@ -0,0 +1,85 @@
+"""
+Gemeinsame Hilfsfunktionen der Benchmarks: Perzentile, JSON-Ergebnisse und
+Vergleich mit einer Baseline.
+"""
+import json
+import math
+import os
+import platform
+import subprocess
+from datetime import datetime
+
+
+def percentile(values, pct):
+    """Perzentil nach der Nearest-Rank-Methode."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(latencies_ms):
+    return {
+        'count': len(latencies_ms),
+        'mean_ms': round(sum(latencies_ms) / len(latencies_ms), 3),
+        'p50_ms': round(percentile(latencies_ms, 50), 3),
+        'p95_ms': round(percentile(latencies_ms, 95), 3),
+        'p99_ms': round(percentile(latencies_ms, 99), 3),
+    }
+
+
+def metadata(**extra):
+    """Umgebung des Laufs, damit Ergebnisse vergleichbar bleiben."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        **extra,
+    }
+
+
+def write_results(path, results):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, default=str)
+
+
+def compare(results, baseline_path, metrics, threshold_pct):
+    """
+    Vergleicht die Ergebnisse mit einer Baseline und gibt eine Tabelle aus.
+
+    Args:
+        results: dict {Name: {Metrik: Wert}}
+        baseline_path: Pfad zur Baseline-JSON (gleiche Struktur unter 'results')
+        metrics: zu vergleichende Metriken (größer = schlechter)
+        threshold_pct: ab dieser Verschlechterung gilt eine Metrik als Regression
+
+    Returns:
+        Liste der Regressionen als (Name, Metrik, alt, neu)
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)['results']
+
+    regressions = []
+    print(f"\n{'Name':<28}{'Metrik':<16}{'Baseline':>12}{'Aktuell':>12}{'Diff':>10}")
+    for name, values in results.items():
+        old_values = baseline.get(name)
+        if not old_values:
+            continue
+        for metric in metrics:
+            old, new = old_values.get(metric), values.get(metric)
+            if old is None or new is None:
+                continue
+            diff = (new - old) / old * 100 if old else 0.0
+            marker = ' !' if diff > threshold_pct else ''
+            print(f'{name:<28}{metric:<16}{old:>12.2f}{new:>12.2f}{diff:>9.1f}%{marker}')
+            if diff > threshold_pct:
+                regressions.append((name, metric, old, new))
+    return regressions
@@ -0,0 +1,110 @@
+"""
+PDF-Benchmark: Seiten pro Sekunde für Pflegeberichte.
+
+Rendert Berichte für einen synthetischen Klienten mit 1.000 bzw. 10.000
+Einträgen direkt über generate_client_report() - ohne Datenbank, damit nur
+das Layout gemessen wird. Die Einträge erzeugt app/datagen.py
+deterministisch, sie entsprechen damit den Testdaten.
+
+Aufruf (aus dem Projektverzeichnis):
+
+    python -m benchmarks.pdf
+    python -m benchmarks.pdf --sizes 1000 10000 50000 --runs 3 \\
+        --baseline instance/benchmarks/pdf.json
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from collections import namedtuple
+from datetime import date
+from io import BytesIO
+
+from benchmarks.common import summarize, metadata, write_results, compare
+
+PAGE_PATTERN = re.compile(rb'/Type /Page\b(?!s)')
+
+Client = namedtuple('Client', 'name birth_date age care_level address notes')
+Entry = namedtuple('Entry', 'category description recorded_by recorded_at')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000],
+                        help='Anzahl Einträge pro Bericht')
+    parser.add_argument('--runs', type=int, default=3, help='Durchläufe pro Größe')
+    parser.add_argument('--output', help='Ergebnis-JSON (Standard: instance/benchmarks/pdf.json)')
+    parser.add_argument('--baseline', help='Baseline-JSON zum Vergleich')
+    parser.add_argument('--threshold', type=float, default=20.0,
+                        help='Regression ab dieser Verschlechterung in Prozent')
+    return parser.parse_args(argv)
+
+
+def synthetic_entries(count, seed=42):
+    """Einträge eines Klienten, neueste zuerst - wie im Bericht."""
+    from app.datagen import Generator
+
+    rows = Generator(seed=seed, end=date(2026, 1, 1)).entries(1, 0, count)
+    entries = [Entry(row['category'], row['description'], row['recorded_by'], row['recorded_at'])
+               for row in rows]
+    entries.reverse()
+    return entries
+
+
+def measure(entries, runs):
+    from app.pdf_generator import generate_client_report
+
+    client = Client('Maria Huber', date(1941, 3, 2), 85, 3, 'Hauptstraße 1, 1010 Wien',
+                    'Allergie gegen Penicillin')
+    latencies = []
+    pages = size = 0
+    for _ in range(runs):
+        started = time.perf_counter()
+        output = generate_client_report(client, iter(entries), output=BytesIO(),
+                                        entry_count=len(entries))
+        latencies.append((time.perf_counter() - started) * 1000)
+        data = output.getvalue()
+        pages = len(PAGE_PATTERN.findall(data))
+        size = len(data)
+
+    result = summarize(latencies)
+    result['pages'] = pages
+    result['bytes'] = size
+    result['pages_per_second'] = round(pages / (result['p50_ms'] / 1000), 1)
+    result['entries_per_second'] = round(len(entries) / (result['p50_ms'] / 1000), 1)
+    return result
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    from app import create_app
+    app = create_app('benchmark')
+
+    results = {}
+    with app.app_context():
+        # Einmal aufwärmen: Imports, Fonts, Styles
+        measure(synthetic_entries(50), 1)
+        for count in args.sizes:
+            name = f'report_{count}'
+            r = results[name] = measure(synthetic_entries(count), args.runs)
+            print(f"{name:<16} p50 {r['p50_ms']:>10.1f} ms  {r['pages']:>6} Seiten  "
+                  f"{r['pages_per_second']:>8.1f} Seiten/s  {r['bytes'] / 1024:>9.1f} KiB")
+
+    output = args.output or os.path.join('instance', 'benchmarks', 'pdf.json')
+    write_results(output, {
+        'meta': metadata(benchmark='pdf', sizes=args.sizes, runs=args.runs),
+        'results': results,
+    })
+    print(f'\nErgebnisse gespeichert: {output}')
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, ['p50_ms', 'p95_ms'], args.threshold)
+        if regressions:
+            print(f'\n{len(regressions)} Regression(en) über {args.threshold}%.')
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""
+Routen-Benchmark mit SQLite- und PostgreSQL-Profil.
+
+Baut die App über create_app('benchmark'), befüllt eine eigene Datenbank
+mit skalierten Testdaten (app/datagen.py) und ruft die wichtigsten Routen
+über den Flask-Testclient auf. Pro Route werden p50/p95/p99-Latenz,
+SQL-Statements pro Request und der Speicher-Peak eines Requests gemessen.
+
+Aufruf (aus dem Projektverzeichnis):
+
+    python -m benchmarks.routes --profile sqlite --scale small
+    BENCHMARK_DATABASE_URL=postgresql://localhost/mid_bench \\
+        python -m benchmarks.routes --profile postgresql --scale medium \\
+        --baseline instance/benchmarks/routes-postgresql.json
+
+ACHTUNG: Die Benchmark-Datenbank wird bei jedem Lauf geleert.
+"""
+import argparse
+import os
+import shutil
+import sys
+import time
+import tracemalloc
+from datetime import date
+
+from benchmarks.common import summarize, metadata, write_results, compare
+
+SCALES = {
+    # Name: (Klienten, Einträge pro Klient)
+    'small': (20, 500),
+    'medium': (200, 2000),
+    'large': (1000, 10000),
+}
+
+BENCH_USER = {'email': 'bench@mid.at', 'name': 'Bench Admin', 'password': 'bench123'}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--profile', choices=['sqlite', 'postgresql'], default='sqlite')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--requests', type=int, default=50, help='Requests pro Route')
+    parser.add_argument('--warmup', type=int, default=3, help='Aufwärm-Requests pro Route')
+    parser.add_argument('--pdf-requests', type=int, default=5, help='Requests für PDF-Routen')
+    parser.add_argument('--output', help='Ergebnis-JSON (Standard: instance/benchmarks/routes-<profil>.json)')
+    parser.add_argument('--baseline', help='Baseline-JSON zum Vergleich')
+    parser.add_argument('--threshold', type=float, default=20.0,
+                        help='Regression ab dieser Verschlechterung in Prozent')
+    parser.add_argument('--skip-seed', action='store_true', help='Vorhandene Daten wiederverwenden')
+    return parser.parse_args(argv)
+
+
+def prepare_database(app, profile, clients, entries_per_client, skip_seed):
+    from app import db
+    from app.models import User, Client
+    from app.datagen import generate
+
+    with app.app_context():
+        if skip_seed and Client.query.count():
+            return
+        if profile == 'postgresql':
+            # Volles Schema inkl. PostgreSQL-spezifischer Indizes und Spalten
+            from flask_migrate import upgrade
+            from app import init_migrations
+            init_migrations(app)
+            db.drop_all()
+            db.session.execute(db.text('DROP TABLE IF EXISTS alembic_version'))
+            db.session.commit()
+            upgrade()
+        else:
+            os.makedirs(os.path.dirname(db.engine.url.database), exist_ok=True)
+            db.drop_all()
+            db.create_all()
+
+        user = User(email=BENCH_USER['email'], name=BENCH_USER['name'], role='admin')
+        user.set_password(BENCH_USER['password'])
+        db.session.add(user)
+        db.session.commit()
+
+        print(f'Erzeuge {clients} Klienten mit je {entries_per_client} Einträgen ...')
+        generate(clients, entries_per_client, seed=42, end=date(2026, 1, 1))
+
+
+def benchmark_routes(app, client_id):
+    """Definition der gemessenen Routen: (Name, URL, Vorbereitung, PDF?)."""
+    from app.stats import invalidate_dashboard_stats
+
+    def clear_export_cache():
+        shutil.rmtree(app.config['EXPORT_CACHE_DIR'], ignore_errors=True)
+
+    def invalidate_dashboard():
+        with app.app_context():
+            invalidate_dashboard_stats()
+
+    return [
+        ('dashboard', '/', None, False),
+        ('dashboard_uncached', '/', invalidate_dashboard, False),
+        ('clients_list', '/clients/', None, False),
+        ('clients_search', '/clients/?search=Huber', None, False),
+        ('clients_typeahead', '/clients/search?q=Hub', None, False),
+        ('client_detail', f'/clients/{client_id}', None, False),
+        ('entries_list', f'/entries/client/{client_id}', None, False),
+        ('entries_history', f'/entries/client/{client_id}?all=1', None, False),
+        ('entries_search', '/entries/search?q=Druckstellen', None, False),
+        ('export_pdf', f'/clients/{client_id}/export', clear_export_cache, True),
+        ('export_pdf_cached', f'/clients/{client_id}/export', None, True),
+    ]
+
+
+def measure(app, test_client, url, setup, requests, warmup):
+    """Führt die Requests aus und liefert Latenzen, Statements und Speicher-Peak."""
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    statements = [0]
+
+    def count(*args):
+        statements[0] += 1
+
+    for _ in range(warmup):
+        if setup:
+            setup()
+        test_client.get(url).close()
+
+    latencies = []
+    event.listen(Engine, 'before_cursor_execute', count)
+    try:
+        for _ in range(requests):
+            if setup:
+                setup()
+            started = time.perf_counter()
+            response = test_client.get(url)
+            response.get_data()
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                raise RuntimeError(f'{url} lieferte Status {response.status_code}')
+            response.close()
+    finally:
+        event.remove(Engine, 'before_cursor_execute', count)
+
+    # Speicher-Peak separat messen, tracemalloc verfälscht die Latenz
+    if setup:
+        setup()
+    tracemalloc.start()
+    test_client.get(url).get_data()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = summarize(latencies)
+    result['queries_per_request'] = round(statements[0] / requests, 2)
+    result['peak_memory_kib'] = round(peak / 1024, 1)
+    return result
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.profile == 'postgresql' and not os.environ.get('BENCHMARK_DATABASE_URL'):
+        sys.exit('Für das PostgreSQL-Profil BENCHMARK_DATABASE_URL setzen.')
+    if args.profile == 'sqlite':
+        os.environ.pop('BENCHMARK_DATABASE_URL', None)
+
+    from sqlalchemy import func
+    from app import create_app, db
+    from app.models import CareEntry
+
+    app = create_app('benchmark')
+    clients, entries_per_client = SCALES[args.scale]
+    prepare_database(app, args.profile, clients, entries_per_client, args.skip_seed)
+
+    with app.app_context():
+        # Klient mit den meisten Einträgen = Worst Case für Detail, Liste, Export
+        client_id = db.session.query(CareEntry.client_id).group_by(
+            CareEntry.client_id).order_by(func.count(CareEntry.id).desc()).limit(1).scalar()
+
+    test_client = app.test_client()
+    response = test_client.post('/auth/login', data={
+        'email': BENCH_USER['email'], 'password': BENCH_USER['password']
+    })
+    if response.status_code != 302:
+        sys.exit('Login für den Benchmark-Benutzer fehlgeschlagen.')
+
+    results = {}
+    for name, url, setup, is_pdf in benchmark_routes(app, client_id):
+        requests = args.pdf_requests if is_pdf else args.requests
+        results[name] = measure(app, test_client, url, setup, requests,
+                                min(args.warmup, requests))
+        r = results[name]
+        print(f"{name:<22} p50 {r['p50_ms']:>9.2f} ms  p95 {r['p95_ms']:>9.2f} ms  "
+              f"p99 {r['p99_ms']:>9.2f} ms  {r['queries_per_request']:>6} SQL/Req  "
+              f"{r['peak_memory_kib']:>10.1f} KiB")
+
+    output = args.output or os.path.join('instance', 'benchmarks', f'routes-{args.profile}.json')
+    write_results(output, {
+        'meta': metadata(benchmark='routes', profile=args.profile, scale=args.scale,
+                         clients=clients, entries_per_client=entries_per_client,
+                         requests=args.requests),
+        'results': results,
+    })
+    print(f'\nErgebnisse gespeichert: {output}')
+
+    if args.baseline:
+        regressions = compare(results, args.baseline,
+                              ['p50_ms', 'p95_ms', 'queries_per_request', 'peak_memory_kib'],
+                              args.threshold)
+        if regressions:
+            print(f'\n{len(regressions)} Regression(en) über {args.threshold}%.')
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
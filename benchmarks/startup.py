@@ -0,0 +1,216 @@
+"""
+Startup-Benchmark: Importzeit, erster Request und Speicher pro Worker.
+
+Jede Messung läuft in einem frischen Interpreter (Kindprozess), damit
+bereits importierte Module das Ergebnis nicht verfälschen:
+
+- lazy: aktueller Stand (reportlab und flask_migrate erst bei Bedarf),
+- eager: reportlab und flask_migrate beim Start importiert - zum Vergleich,
+- jeweils mit leerem und mit gefülltem Jinja-Bytecode-Cache.
+
+Mit --gunicorn werden zusätzlich echte gunicorn-Worker mit und ohne
+preload_app gestartet und ihr Speicher aus /proc/<pid>/smaps_rollup gelesen
+(RSS, PSS und USS = nur diesem Worker gehörende Seiten; nur Linux).
+
+Aufruf (aus dem Projektverzeichnis):
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --gunicorn --workers 4
+"""
+import argparse
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+
+from benchmarks.common import metadata, write_results, compare
+
+BASEDIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+CACHE_DIR = os.path.join(BASEDIR, 'instance', 'benchmark', 'jinja_cache')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--runs', type=int, default=5, help='Kindprozesse pro Variante')
+    parser.add_argument('--gunicorn', action='store_true', help='Auch gunicorn-Worker messen')
+    parser.add_argument('--workers', type=int, default=4, help='Worker für --gunicorn')
+    parser.add_argument('--port', type=int, default=8799)
+    parser.add_argument('--output', help='Ergebnis-JSON (Standard: instance/benchmarks/startup.json)')
+    parser.add_argument('--baseline', help='Baseline-JSON zum Vergleich')
+    parser.add_argument('--threshold', type=float, default=20.0,
+                        help='Regression ab dieser Verschlechterung in Prozent')
+    parser.add_argument('--child', choices=['lazy', 'eager'], help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def _rss_kib(pid='self'):
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return None
+
+
+def child(mode):
+    """Misst im frischen Interpreter und gibt das Ergebnis als JSON aus."""
+    started = time.perf_counter()
+    from app import create_app, init_migrations
+    imported = time.perf_counter()
+    flask_app = create_app('benchmark')
+    if mode == 'eager':
+        from app import pdf_generator  # noqa: F401
+        init_migrations(flask_app)
+    created = time.perf_counter()
+
+    # Erster Request: übersetzt (oder lädt) die Templates
+    response = flask_app.test_client().get('/auth/login')
+    response.get_data()
+    first_request = time.perf_counter()
+
+    print(json.dumps({
+        'import_ms': (imported - started) * 1000,
+        'create_app_ms': (created - imported) * 1000,
+        'first_request_ms': (first_request - created) * 1000,
+        'total_ms': (first_request - started) * 1000,
+        'rss_kib': _rss_kib(),
+        'modules': len(sys.modules),
+        'reportlab_loaded': 'reportlab' in sys.modules,
+    }))
+
+
+def run_child(mode, cold):
+    if cold:
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+    output = subprocess.run([sys.executable, '-m', 'benchmarks.startup', '--child', mode],
+                            cwd=BASEDIR, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure_imports(runs):
+    results = {}
+    for mode in ('eager', 'lazy'):
+        for cold in (True, False):
+            name = f"{mode}_{'cold' if cold else 'warm'}_templates"
+            if not cold:
+                run_child(mode, cold=True)  # Cache füllen
+            samples = [run_child(mode, cold) for _ in range(runs)]
+            result = {key: round(sorted(s[key] for s in samples)[len(samples) // 2], 2)
+                      for key in ('import_ms', 'create_app_ms', 'first_request_ms', 'total_ms',
+                                  'rss_kib', 'modules')}
+            result['reportlab_loaded'] = samples[0]['reportlab_loaded']
+            results[name] = result
+            print(f"{name:<28} Import {result['import_ms']:>7.1f} ms  create_app "
+                  f"{result['create_app_ms']:>6.1f} ms  1. Request {result['first_request_ms']:>6.1f} ms  "
+                  f"RSS {result['rss_kib'] / 1024:>6.1f} MiB  {result['modules']} Module")
+    return results
+
+
+def _smaps(pid):
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                values[parts[0].rstrip(':')] = int(parts[1])
+    return {
+        'rss_kib': values.get('Rss', 0),
+        'pss_kib': values.get('Pss', 0),
+        'uss_kib': values.get('Private_Clean', 0) + values.get('Private_Dirty', 0),
+    }
+
+
+def _worker_pids(master_pid):
+    with open(f'/proc/{master_pid}/task/{master_pid}/children') as f:
+        return [int(pid) for pid in f.read().split()]
+
+
+def measure_gunicorn(preload, workers, port):
+    """Startet gunicorn, wartet auf alle Worker und misst deren Speicher."""
+    env = dict(os.environ, GUNICORN_PRELOAD='1' if preload else '0', WEB_CONCURRENCY=str(workers),
+               PORT=str(port), DATABASE_URL=os.environ.get('BENCHMARK_DATABASE_URL') or
+               'sqlite:///' + os.path.join(BASEDIR, 'instance', 'benchmark.db'),
+               PROMETHEUS_MULTIPROC_DIR=os.path.join(BASEDIR, 'instance', 'benchmark', 'prometheus'),
+               JINJA_BYTECODE_CACHE_DIR=CACHE_DIR)
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+                                'app:create_app()'], cwd=BASEDIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.time() + 60
+        while True:
+            try:
+                urllib.request.urlopen(f'http://127.0.0.1:{port}/auth/login', timeout=1).read()
+                if len(_worker_pids(process.pid)) == workers:
+                    break
+            except OSError:
+                pass
+            if time.time() > deadline:
+                raise RuntimeError('gunicorn ist nicht rechtzeitig gestartet')
+            time.sleep(0.05)
+        ready_ms = (time.perf_counter() - started) * 1000
+
+        # Jeden Worker einmal arbeiten lassen, damit die Werte realistisch sind
+        for _ in range(workers * 4):
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/auth/login', timeout=5).read()
+
+        per_worker = [_smaps(pid) for pid in _worker_pids(process.pid)]
+        master = _smaps(process.pid)
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=30)
+
+    result = {key: round(sum(w[key] for w in per_worker) / len(per_worker), 1)
+              for key in ('rss_kib', 'pss_kib', 'uss_kib')}
+    result['ready_ms'] = round(ready_ms, 1)
+    result['master_rss_kib'] = master['rss_kib']
+    result['total_pss_kib'] = round(master['pss_kib'] + sum(w['pss_kib'] for w in per_worker), 1)
+    return result
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.child:
+        child(args.child)
+        return 0
+
+    results = measure_imports(args.runs)
+
+    if args.gunicorn:
+        if not os.path.exists('/proc/self/smaps_rollup'):
+            sys.exit('--gunicorn benötigt Linux (/proc/<pid>/smaps_rollup).')
+        from app import create_app, db
+        app = create_app('benchmark')
+        with app.app_context():
+            os.makedirs(os.path.join(BASEDIR, 'instance'), exist_ok=True)
+            db.create_all()
+        for preload in (False, True):
+            name = f"gunicorn_{'preload' if preload else 'no_preload'}"
+            r = results[name] = measure_gunicorn(preload, args.workers, args.port)
+            print(f"{name:<28} bereit nach {r['ready_ms']:>7.1f} ms  pro Worker: RSS "
+                  f"{r['rss_kib'] / 1024:>6.1f} MiB  PSS {r['pss_kib'] / 1024:>6.1f} MiB  "
+                  f"USS {r['uss_kib'] / 1024:>6.1f} MiB  gesamt PSS {r['total_pss_kib'] / 1024:>6.1f} MiB")
+
+    output = args.output or os.path.join('instance', 'benchmarks', 'startup.json')
+    write_results(output, {
+        'meta': metadata(benchmark='startup', runs=args.runs,
+                         workers=args.workers if args.gunicorn else None),
+        'results': results,
+    })
+    print(f'\nErgebnisse gespeichert: {output}')
+
+    if args.baseline:
+        regressions = compare(results, args.baseline,
+                              ['import_ms', 'first_request_ms', 'rss_kib', 'uss_kib'],
+                              args.threshold)
+        if regressions:
+            print(f'\n{len(regressions)} Regression(en) über {args.threshold}%.')
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""
+gunicorn-Konfiguration (siehe Procfile).
+
+Richtet den Multiprozess-Modus von prometheus_client ein: Alle Worker
+schreiben ihre Metriken nach PROMETHEUS_MULTIPROC_DIR, /metrics fasst sie
+zusammen. Das Verzeichnis wird beim Start geleert, beendete Worker werden
+abgemeldet, damit ihre Pool-Gauges nicht weiter zählen.
+
+Mit preload_app (Standard, abschalten mit GUNICORN_PRELOAD=0) lädt der
+Master die App einmal, übersetzt alle Templates und friert den Heap ein
+(app/startup.py); die Worker teilen sich diesen Speicher per Copy-on-Write
+und starten ohne eigene Imports.
+"""
+import glob
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') != '0'
+
+_basedir = os.path.abspath(os.path.dirname(__file__))
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(_basedir, 'instance', 'prometheus'))
+# Muss vor dem Import der App (preload_app) existieren
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+
+def on_starting(server):
+    path = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    # Mit preload_app hat der Master seine Dateien bereits angelegt
+    own = f'_{os.getpid()}.db'
+    for name in glob.glob(os.path.join(path, '*.db')):
+        if not name.endswith(own):
+            os.remove(name)
+
+
+def when_ready(server):
+    if preload_app:
+        from app.startup import prepare_fork
+        prepare_fork(server.app.wsgi())
+
+
+def post_fork(server, worker):
+    from app import startup
+    # Lange Downloads halten den Worker am Leben (app/startup.py)
+    startup.register_heartbeat(worker.notify)
+    if preload_app:
+        startup.after_fork(server.app.wsgi())
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
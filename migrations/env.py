@@ -1,4 +1,5 @@
 import logging
+import re
 from logging.config import fileConfig
 
 from flask import current_app
@@ -45,6 +46,25 @@ target_db = current_app.extensions['migrate'].db
 # ... etc.
 
 
+# Spalten, die nur per Migration (PostgreSQL) existieren und bewusst nicht
+# im Modell stehen - autogenerate soll sie nicht entfernen wollen.
+UNMAPPED_COLUMNS = {('care_entries', 'search_vector')}
+
+
+# Monats-Partitionen von care_entries (app/partitions.py) stehen nicht im Modell
+PARTITION_TABLE = re.compile(r'^care_entries_(p\d{4}_\d{2}|default)$')
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == 'table' and reflected and PARTITION_TABLE.match(name):
+        return False
+    if type_ == 'column' and (object.table.name, name) in UNMAPPED_COLUMNS:
+        return False
+    if type_ == 'index' and name == 'ix_care_entries_search_vector':
+        return False
+    return True
+
+
 def get_metadata():
     if hasattr(target_db, 'metadatas'):
         return target_db.metadatas[None]
@@ -93,6 +113,7 @@ def run_migrations_online():
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    conf_args.setdefault("include_object", include_object)
 
     connectable = get_engine()
 
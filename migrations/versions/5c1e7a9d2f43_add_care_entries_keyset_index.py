@@ -0,0 +1,26 @@
+"""Add composite index for care entry keyset pagination
+
+Revision ID: 5c1e7a9d2f43
+Revises: 103f0c0db763
+Create Date: 2026-10-18 09:12:41.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c1e7a9d2f43'
+down_revision = '103f0c0db763'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_care_entries_client_recorded', 'care_entries',
+                    ['client_id', sa.text('recorded_at DESC'), sa.text('id DESC')],
+                    unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_care_entries_client_recorded', table_name='care_entries')
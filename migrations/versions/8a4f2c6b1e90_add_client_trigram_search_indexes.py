@@ -0,0 +1,33 @@
+"""Add pg_trgm GIN indexes for client search
+
+Revision ID: 8a4f2c6b1e90
+Revises: 5c1e7a9d2f43
+Create Date: 2026-10-18 10:27:05.733951
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8a4f2c6b1e90'
+down_revision = '5c1e7a9d2f43'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Trigramm-Indizes gibt es nur auf PostgreSQL
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index('ix_clients_name_trgm', 'clients', ['name'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index('ix_clients_address_trgm', 'clients', ['address'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'address': 'gin_trgm_ops'})
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_clients_address_trgm', table_name='clients')
+    op.drop_index('ix_clients_name_trgm', table_name='clients')
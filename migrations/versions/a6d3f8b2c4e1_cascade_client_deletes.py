@@ -0,0 +1,38 @@
+"""Delete care entries and archive manifests with their client (ON DELETE CASCADE)
+
+Revision ID: a6d3f8b2c4e1
+Revises: f2a8c5e1d3b7
+Create Date: 2026-10-18 16:52:37.108254
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6d3f8b2c4e1'
+down_revision = 'f2a8c5e1d3b7'
+branch_labels = None
+depends_on = None
+
+TABLES = ('care_entries', 'entry_archives')
+
+
+def upgrade():
+    # SQLite prüft hier keine Fremdschlüssel (kein PRAGMA foreign_keys);
+    # app/purge.py löscht abhängige Zeilen ohnehin selbst.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for table in TABLES:
+        # Auf dem partitionierten care_entries gilt das für alle Partitionen
+        op.drop_constraint(f'{table}_client_id_fkey', table, type_='foreignkey')
+        op.create_foreign_key(f'{table}_client_id_fkey', table, 'clients',
+                              ['client_id'], ['id'], ondelete='CASCADE')
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for table in TABLES:
+        op.drop_constraint(f'{table}_client_id_fkey', table, type_='foreignkey')
+        op.create_foreign_key(f'{table}_client_id_fkey', table, 'clients',
+                              ['client_id'], ['id'])
@@ -0,0 +1,35 @@
+"""Add German full-text search vector to care_entries
+
+Revision ID: c3d9e1f5a7b2
+Revises: 8a4f2c6b1e90
+Create Date: 2026-10-18 11:03:52.164870
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3d9e1f5a7b2'
+down_revision = '8a4f2c6b1e90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Generierte tsvector-Spalte gibt es nur auf PostgreSQL (>= 12);
+    # sie wird bei INSERT und UPDATE automatisch neu berechnet.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute(
+        "ALTER TABLE care_entries ADD COLUMN search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('german', description)) STORED"
+    )
+    op.create_index('ix_care_entries_search_vector', 'care_entries', ['search_vector'],
+                    unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_care_entries_search_vector', table_name='care_entries')
+    op.drop_column('care_entries', 'search_vector')
@@ -0,0 +1,125 @@
+"""Partition care_entries by month of recorded_at
+
+Revision ID: e7b4d2a9c1f6
+Revises: c3d9e1f5a7b2
+Create Date: 2026-10-18 14:26:08.517302
+
+"""
+from datetime import date
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7b4d2a9c1f6'
+down_revision = 'c3d9e1f5a7b2'
+branch_labels = None
+depends_on = None
+
+COLUMNS = 'id, client_id, category, description, recorded_by, recorded_at, created_at'
+
+# Partitionen im Voraus (weitere legt `flask partitions ensure` an)
+MONTHS_AHEAD = 3
+
+
+def _add_months(day, months):
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def upgrade():
+    # Partitionsschlüssel muss Teil des Primärschlüssels und NOT NULL sein
+    op.execute("UPDATE care_entries SET recorded_at = COALESCE(created_at, CURRENT_TIMESTAMP) "
+               "WHERE recorded_at IS NULL")
+
+    if op.get_bind().dialect.name != 'postgresql':
+        # Für "Einträge heute" und die neuesten Einträge auf dem Dashboard
+        op.create_index('ix_care_entries_recorded_at', 'care_entries', ['recorded_at'], unique=False)
+        with op.batch_alter_table('care_entries') as batch_op:
+            batch_op.alter_column('recorded_at', existing_type=sa.DateTime(), nullable=False)
+        return
+
+    op.execute("ALTER TABLE care_entries RENAME TO care_entries_legacy")
+    op.execute("ALTER TABLE care_entries_legacy RENAME CONSTRAINT care_entries_pkey TO care_entries_legacy_pkey")
+    for index in ('ix_care_entries_client_recorded', 'ix_care_entries_search_vector'):
+        op.execute(f"ALTER INDEX {index} RENAME TO {index.replace('care_entries', 'care_entries_legacy')}")
+
+    op.execute(
+        "CREATE TABLE care_entries ("
+        " id integer NOT NULL DEFAULT nextval('care_entries_id_seq'),"
+        " client_id integer NOT NULL REFERENCES clients (id),"
+        " category varchar(50) NOT NULL,"
+        " description text NOT NULL,"
+        " recorded_by varchar(100) NOT NULL,"
+        " recorded_at timestamp without time zone NOT NULL,"
+        " created_at timestamp without time zone,"
+        " search_vector tsvector GENERATED ALWAYS AS (to_tsvector('german', description)) STORED,"
+        " CONSTRAINT care_entries_pkey PRIMARY KEY (id, recorded_at)"
+        ") PARTITION BY RANGE (recorded_at)"
+    )
+    op.execute("ALTER SEQUENCE care_entries_id_seq OWNED BY care_entries.id")
+    op.execute("CREATE TABLE care_entries_default PARTITION OF care_entries DEFAULT")
+
+    # Eine Partition je Monat vom ältesten Eintrag bis MONTHS_AHEAD Monate voraus
+    oldest = op.get_bind().execute(sa.text("SELECT min(recorded_at) FROM care_entries_legacy")).scalar()
+    current = date.today().replace(day=1)
+    month = oldest.date().replace(day=1) if oldest else current
+    while month <= _add_months(current, MONTHS_AHEAD):
+        following = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE care_entries_p{month.year:04d}_{month.month:02d} PARTITION OF care_entries "
+            f"FOR VALUES FROM ('{month}') TO ('{following}')"
+        )
+        month = following
+
+    op.execute(f"INSERT INTO care_entries ({COLUMNS}) SELECT {COLUMNS} FROM care_entries_legacy")
+    op.execute("DROP TABLE care_entries_legacy")
+
+    # Indizes auf der Elterntabelle gelten für alle Partitionen
+    op.create_index('ix_care_entries_client_recorded', 'care_entries',
+                    ['client_id', sa.text('recorded_at DESC'), sa.text('id DESC')],
+                    unique=False)
+    # Für "Einträge heute" und die neuesten Einträge auf dem Dashboard
+    op.create_index('ix_care_entries_recorded_at', 'care_entries', ['recorded_at'], unique=False)
+    op.create_index('ix_care_entries_search_vector', 'care_entries', ['search_vector'],
+                    unique=False, postgresql_using='gin')
+    op.execute("ANALYZE care_entries")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        with op.batch_alter_table('care_entries') as batch_op:
+            batch_op.alter_column('recorded_at', existing_type=sa.DateTime(), nullable=True)
+        op.drop_index('ix_care_entries_recorded_at', table_name='care_entries')
+        return
+
+    op.execute("ALTER TABLE care_entries RENAME TO care_entries_partitioned")
+    op.execute("ALTER TABLE care_entries_partitioned RENAME CONSTRAINT care_entries_pkey "
+               "TO care_entries_partitioned_pkey")
+    for index in ('ix_care_entries_client_recorded', 'ix_care_entries_search_vector',
+                  'ix_care_entries_recorded_at'):
+        op.execute(f"ALTER INDEX {index} RENAME TO {index.replace('care_entries', 'care_entries_partitioned')}")
+
+    op.execute(
+        "CREATE TABLE care_entries ("
+        " id integer NOT NULL DEFAULT nextval('care_entries_id_seq'),"
+        " client_id integer NOT NULL REFERENCES clients (id),"
+        " category varchar(50) NOT NULL,"
+        " description text NOT NULL,"
+        " recorded_by varchar(100) NOT NULL,"
+        " recorded_at timestamp without time zone,"
+        " created_at timestamp without time zone,"
+        " search_vector tsvector GENERATED ALWAYS AS (to_tsvector('german', description)) STORED,"
+        " CONSTRAINT care_entries_pkey PRIMARY KEY (id)"
+        ")"
+    )
+    op.execute("ALTER SEQUENCE care_entries_id_seq OWNED BY care_entries.id")
+    op.execute(f"INSERT INTO care_entries ({COLUMNS}) SELECT {COLUMNS} FROM care_entries_partitioned")
+    # Partitionen werden mit der Elterntabelle gelöscht
+    op.execute("DROP TABLE care_entries_partitioned")
+
+    op.create_index('ix_care_entries_client_recorded', 'care_entries',
+                    ['client_id', sa.text('recorded_at DESC'), sa.text('id DESC')],
+                    unique=False)
+    op.create_index('ix_care_entries_search_vector', 'care_entries', ['search_vector'],
+                    unique=False, postgresql_using='gin')
@@ -0,0 +1,42 @@
+import os
+import pytest
+
+# Module wie seed.py legen beim Import eine App mit der Standard-Konfiguration an
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from app import create_app, db
+from app.models import User
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app('testing')
+    app.config.update(
+        EXPORT_CACHE_DIR=str(tmp_path / 'exports'),
+        ARCHIVE_DIR=str(tmp_path / 'archive'),
+        DASHBOARD_STATS_FILE=str(tmp_path / 'dashboard_stats.stamp'),
+        USER_CACHE_STAMP_FILE=str(tmp_path / 'user_cache.stamp'),
+    )
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def admin(app):
+    user = User(email='admin@example.org', name='Admin', role='admin')
+    user.set_password('geheim')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def client(app, admin):
+    """Test-Client mit angemeldetem Admin."""
+    client = app.test_client()
+    response = client.post('/auth/login', data={'email': admin.email, 'password': 'geheim'})
+    assert response.status_code == 302
+    return client
@@ -0,0 +1,44 @@
+import io
+from datetime import datetime
+from app import db
+from app.archive import archive_entries
+from app.entry_export import EntryFilter, ExportRow, iter_csv, iter_export_rows, _reversed_lines
+from app.models import Client, CareEntry
+
+
+def _add_entries():
+    for name in ('Maria Huber', 'Franz Müller', 'Anna Berger'):
+        patient = Client(name=name)
+        db.session.add(patient)
+        db.session.flush()
+        for day in range(1, 29, 3):
+            db.session.add(CareEntry(
+                client_id=patient.id, category='grundpflege', description=f'{name}\nTag {day}',
+                recorded_by='Anna', recorded_at=datetime(2023, 1 + day % 3, day, 8, patient.id)
+            ))
+    db.session.commit()
+
+
+def test_reversed_lines():
+    lines = [f'Zeile {number}'.encode() * number for number in range(1, 40)]
+    data = io.BytesIO(b'\n'.join(lines) + b'\n')
+    assert list(_reversed_lines(data, block_size=7)) == lines[::-1]
+
+
+def test_archived_rows_are_merged_in_order(app):
+    _add_entries()
+    total = CareEntry.query.count()
+    archive_entries(datetime(2023, 3, 1))
+    assert CareEntry.query.count() < total
+
+    rows = list(iter_export_rows(EntryFilter(None, None, None, None), chunk_size=5))
+    assert len(rows) == total
+    assert [(row.recorded_at, row.id) for row in rows] == sorted((row.recorded_at, row.id) for row in rows)
+    assert all(row.client_name in row.description for row in rows)
+
+
+def test_csv_neutralizes_formulas(app):
+    row = ExportRow(1, 2, '=HYPERLINK("x")', 'grundpflege', '-2+3', '@Anna',
+                    datetime(2023, 1, 1, 8, 0), None)
+    text = b''.join(iter_csv([row], flush_rows=10)).decode('utf-8-sig')
+    assert text.splitlines()[1] == '1;2;"\'=HYPERLINK(""x"")";Grundpflege;\'-2+3;\'@Anna;2023-01-01 08:00:00;'
@@ -0,0 +1,66 @@
+import os
+from datetime import date, datetime
+from app import db, exports
+from app.models import Client
+
+
+def _client():
+    patient = Client(name='Maria Huber')
+    db.session.add(patient)
+    db.session.commit()
+    return patient
+
+
+def test_job_id_changes_with_date(app, monkeypatch):
+    patient = _client()
+    today = exports.report_job_id(patient)
+
+    class Tomorrow(date):
+        @classmethod
+        def today(cls):
+            return date(2099, 1, 1)
+
+    monkeypatch.setattr(exports, 'date', Tomorrow)
+    tomorrow = exports.report_job_id(patient)
+    assert exports.JOB_ID_PATTERN.match(tomorrow)
+    assert tomorrow != today
+    assert tomorrow.startswith(exports._report_scope(patient.id, None, None))
+
+
+def test_store_report_keeps_other_ranges_and_markers(app):
+    patient = _client()
+    date_from, date_to = datetime(2026, 1, 1), datetime(2026, 2, 1)
+    ranged = exports.report_job_id(patient, date_from, date_to)
+    exports.store_report(patient, ranged, date_from, date_to)
+    old = exports.report_job_id(patient)
+    exports.store_report(patient, old)
+
+    # Ein Hintergrund-Job für den alten Stand läuft noch
+    with open(exports._marker_path(old, 'pending'), 'w'):
+        pass
+    patient.notes = 'geändert'
+    db.session.commit()
+    current = exports.report_job_id(patient)
+    exports.store_report(patient, current)
+
+    assert exports.job_status(current) == 'done'
+    assert not os.path.exists(exports.report_path(old))
+    assert exports.job_status(old) == 'pending'
+    assert exports.job_status(ranged) == 'done'
+
+
+def test_export_does_not_block_on_pending_job(client):
+    patient = _client()
+    job_id = exports.report_job_id(patient)
+    with open(exports._marker_path(job_id, 'pending'), 'w'):
+        pass
+
+    response = client.get(f'/clients/{patient.id}/export')
+    assert response.status_code == 202
+    assert response.get_json()['status'] == 'pending'
+    assert not os.path.exists(exports.report_path(job_id))
+
+    os.unlink(exports._marker_path(job_id, 'pending'))
+    response = client.get(f'/clients/{patient.id}/export')
+    assert response.status_code == 200
+    assert response.data[:4] == b'%PDF'
@@ -0,0 +1,30 @@
+from datetime import datetime
+import pytest
+from app import db
+from app.models import Client, CareEntry
+
+
+def _add_entry(client_id, description):
+    entry = CareEntry(client_id=client_id, category='grundpflege', description=description,
+                      recorded_by='Anna', recorded_at=datetime.utcnow())
+    db.session.add(entry)
+    db.session.commit()
+    return entry.id
+
+
+@pytest.mark.parametrize('url', ['/entries/client/{id}', '/clients/{id}'])
+def test_reused_entry_id_is_not_served_from_cache(app, client, url):
+    patient = Client(name='Maria Huber')
+    db.session.add(patient)
+    db.session.commit()
+    url = url.format(id=patient.id)
+
+    old_id = _add_entry(patient.id, 'ALTER TEXT')
+    assert 'ALTER TEXT' in client.get(url).get_data(as_text=True)
+    assert client.post(f'/entries/{old_id}/delete').status_code == 302
+
+    # SQLite vergibt die höchste gelöschte rowid erneut
+    assert _add_entry(patient.id, 'NEUER TEXT') == old_id
+    page = client.get(url).get_data(as_text=True)
+    assert 'NEUER TEXT' in page
+    assert 'ALTER TEXT' not in page
@@ -0,0 +1,49 @@
+from datetime import datetime
+import pytest
+from app import db
+from app.models import Client, CareEntry
+
+
+def _post(client, recorded_at):
+    patient = Client(name='Maria Huber')
+    db.session.add(patient)
+    db.session.commit()
+    response = client.post('/entries/bulk', json=[{
+        'client_id': patient.id, 'category': 'grundpflege',
+        'description': 'Morgenpflege durchgeführt', 'recorded_at': recorded_at,
+    }])
+    assert response.status_code == 201, response.get_json()
+    return db.session.scalar(db.select(CareEntry.recorded_at).where(CareEntry.client_id == patient.id))
+
+
+def test_offset_is_converted_to_utc(client):
+    assert _post(client, '2026-10-18T08:00:00+02:00') == datetime(2026, 10, 18, 6, 0)
+
+
+def test_zulu_and_naive_are_stored_unchanged(client):
+    assert _post(client, '2026-10-18T08:00:00Z') == datetime(2026, 10, 18, 8, 0)
+    assert _post(client, '2026-10-18T08:00:00') == datetime(2026, 10, 18, 8, 0)
+
+
+@pytest.mark.parametrize('client_id', [True, 1.9, '1.9', '²', None])
+def test_client_id_must_be_an_integer(client, client_id):
+    patient = Client(name='Maria Huber')
+    db.session.add(patient)
+    db.session.commit()
+    assert patient.id == 1
+    response = client.post('/entries/bulk', json=[{
+        'client_id': client_id, 'category': 'grundpflege', 'description': 'Morgenpflege durchgeführt',
+    }])
+    assert response.status_code == 422
+    assert response.get_json()['results'][0]['errors']['client_id'] == ['Unbekannter Klient']
+    assert CareEntry.query.count() == 0
+
+
+@pytest.mark.parametrize('client_id', [1, '1', ' 1 '])
+def test_client_id_accepts_integers_and_digit_strings(client, client_id):
+    db.session.add(Client(name='Maria Huber'))
+    db.session.commit()
+    response = client.post('/entries/bulk', json=[{
+        'client_id': client_id, 'category': 'grundpflege', 'description': 'Morgenpflege durchgeführt',
+    }])
+    assert response.status_code == 201
@@ -0,0 +1,74 @@
+"""
+SQL-Statements pro Request der Listen-Routen.
+
+Die Anzahl darf nicht mit der Zahl der Klienten bzw. Einträge wachsen (kein
+N+1). Gezählt wird mit angemeldetem Benutzer im Cache, aber leerem
+Fragment- und Dashboard-Cache.
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import event
+from app import db
+from app.models import Client, CareEntry
+from app.stats import invalidate_dashboard_stats
+
+
+@contextmanager
+def count_statements():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+
+def _add_clients(count, entries_per_client):
+    now = datetime.utcnow()
+    for number in range(count):
+        patient = Client(name=f'Klient {number:03d}', birth_date=datetime(1940, 1, 1).date(), care_level=2)
+        db.session.add(patient)
+        db.session.flush()
+        db.session.add_all(CareEntry(
+            client_id=patient.id, category='grundpflege', description=f'Eintrag {index}',
+            recorded_by='Anna', recorded_at=now - timedelta(hours=index)
+        ) for index in range(entries_per_client))
+    db.session.commit()
+
+
+def _statements(app, client, url):
+    assert client.get(url).status_code == 200
+    app.extensions['fragment_cache'].clear()
+    invalidate_dashboard_stats()
+    with count_statements() as statements:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(statements)
+
+
+def _first_client_id():
+    return db.session.scalar(db.select(Client.id).order_by(Client.id))
+
+
+@pytest.mark.parametrize('url', ['/', '/clients/', '/entries/client/{id}'])
+def test_query_count_does_not_grow_with_data(app, client, url):
+    _add_clients(5, 5)
+    few = _statements(app, client, url.format(id=_first_client_id()))
+    _add_clients(20, 40)
+    many = _statements(app, client, url.format(id=_first_client_id()))
+    assert many == few
+
+
+@pytest.mark.parametrize('url, budget', [
+    ('/', 3),                     # Klientenzahl, Einträge heute, letzte Einträge
+    ('/clients/', 1),             # Klienten samt Aktivität
+    ('/entries/client/{id}', 4),  # ETag, Klient, Einträge, Archiv-Monate
+])
+def test_query_count_per_route(app, client, url, budget):
+    _add_clients(10, 20)
+    assert _statements(app, client, url.format(id=_first_client_id())) <= budget
@@ -0,0 +1,13 @@
+import seed
+from app.models import Client, ClientActivity
+from app.demo_data import CLIENTS, ENTRIES
+
+
+def test_seed_twice(app, monkeypatch):
+    monkeypatch.setattr(seed, 'app', app)
+    seed.seed_database()
+    seed.seed_database()
+
+    assert Client.query.count() == len(CLIENTS)
+    assert ClientActivity.query.count() == len(CLIENTS)
+    assert sum(activity.entry_count for activity in ClientActivity.query) == len(ENTRIES)